@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from app.schemas.user import UserLogin, Token, UserOut
-from app.core.security import verify_password, create_access_token
-from app.core.dependencies import get_current_user
+from app.core.security import verify_and_update_password, create_access_token
+from app.core.dependencies import get_current_user, invalidate_cached_user
 from app.database import db
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
@@ -9,8 +9,18 @@ router = APIRouter(prefix="/auth", tags=["Authentication"])
 @router.post("/login", response_model=Token)
 async def login(login_data: UserLogin):
     user = await db.db["users"].find_one({"email": login_data.email})
-    if not user or not verify_password(login_data.password, user["hashed_password"]):
+    if not user:
         raise HTTPException(status_code=400, detail="Incorrect email or password")
+    valid, new_hash = await verify_and_update_password(login_data.password, user["hashed_password"])
+    if not valid:
+        raise HTTPException(status_code=400, detail="Incorrect email or password")
+    if new_hash:
+        # BCRYPT_ROUNDS changed since this hash was made; upgrade it transparently
+        await db.db["users"].update_one(
+            {"_id": user["_id"], "hashed_password": user["hashed_password"]},
+            {"$set": {"hashed_password": new_hash}}
+        )
+        invalidate_cached_user(user["_id"])
     access_token = create_access_token(data={"sub": user["empID"]})
     return {"access_token": access_token, "token_type": "bearer"}
 
@@ -1,112 +1,157 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Header, Query, Request
 from typing import List, Optional
-from app.schemas.client import ClientCreate, ClientOut
+from app.schemas.client import ClientCreate, ClientOut, ClientDispatch, ClientImportResult
+from app.schemas.task import TaskOut
 from app.database import db
 from app.core.dependencies import get_current_user
 from app.utils.helpers import generate_client_id
+from app.utils.pagination import fetch_page, select_fields, stream_ndjson
+from app.utils.encoding import wants_msgpack
 from bson import ObjectId
-from app.utils.helpers import generate_activity_code
+from app.utils.helpers import generate_activity_code, build_team_task, TEAM_SERVICES
+from app.utils.helpers import DELIVERABLE_KEYS, client_merge_pipeline, is_selected
+from app.core.events import publish_change
+from app.utils.versions import bump_version, bump_versions, current_etag, etag_matches, not_modified, variant_etag, with_etag
+from app.utils.team_stats import record_tasks_created
+from app.utils.search_keys import CLIENT_SEARCH_KEYS
+from app.utils.archive import CLIENTS_ARCHIVE
+from app.utils.client_import import IMPORT_BATCH_SIZE, import_clients
+from app.utils.tabular import read_csv_rows, read_ndjson_rows
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 
 router = APIRouter(prefix="/clients", tags=["Clients"])
 
 @router.get("/", response_model=List[ClientOut])
-async def get_clients(archived: Optional[bool] = False, current_user=Depends(get_current_user)):
+async def get_clients(
+    archived: Optional[bool] = False,
+    limit: Optional[int] = Query(None, ge=1),
+    after: Optional[str] = None,
+    fields: Optional[str] = None,
+    stream: bool = False,
+    if_none_match: Optional[str] = Header(None),
+    accept: Optional[str] = Header(None),
+    current_user=Depends(get_current_user)
+):
+    names = select_fields(ClientOut, fields)
+    etag = await current_etag(db.db, "clients")
+    if wants_msgpack(accept):
+        etag = variant_etag(etag, "msgpack")
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
     query = {"isArchived": archived}
-    cursor = db.db["clients"].find(query)
-    clients = await cursor.to_list(length=None)
-    # Convert _id to id for response
-    for c in clients:
-        c["id"] = str(c["_id"])
-    return clients
+    # Archived clients past the retention age live in clients_archive
+    union = CLIENTS_ARCHIVE if archived else None
+    if stream:
+        return with_etag(stream_ndjson(db.db["clients"], query, ClientOut, limit=limit, after=after, union=union, accept=accept, fields=names), etag)
+    return with_etag(await fetch_page(db.db["clients"], query, ClientOut, limit=limit, after=after, union=union, accept=accept, fields=names), etag)
 
 @router.post("/", response_model=ClientOut)
 async def create_client(client_data: ClientCreate, current_user=Depends(get_current_user)):
-    # Check if client exists with same name and phone (not archived)
-    print("Received client data:", client_data)
-    existing = await db.db["clients"].find_one({
-        "clientName": client_data.clientName,
-        "phone": client_data.phone,
-        "isArchived": False
-    })
-    if existing:
-        # Merge logic: update existing client with new deliverables
-        # For simplicity, we'll just update the existing record with new counts added.
-        # We'll need to sum counts/amounts/minutes.
-        updated = dict(existing)
-        for key in ["Web", "SEO", "Campaign", "Calls", "Posters", "Reels", "Shorts", "Longform", "Carousel", "EventDay", "Blog"]:
-            if getattr(client_data, key) is not None:
-                new_item = getattr(client_data, key)
-                old_item = updated.get(key, {})
-                # For checked/unchecked? In frontend, if checked is true, we add.
-                # Since we don't have "checked" in schema, we assume if present and has count>0, it's selected.
-                if new_item and new_item.get("count", 0) > 0:
-                    # Merge counts, amounts, mins
-                    old_count = old_item.get("count", 0)
-                    old_amount = old_item.get("amount", 0) or old_item.get("amo", 0)
-                    old_min = old_item.get("min", 0)
-                    new_count = new_item.get("count", 0)
-                    new_amount = new_item.get("amount", 0) or new_item.get("amo", 0)
-                    new_min = new_item.get("min", 0)
-                    updated[key] = {
-                        "count": old_count + new_count,
-                        "amount": old_amount + new_amount,
-                        "min": old_min + new_min,
-                        "description": new_item.get("description", old_item.get("description", ""))
-                    }
-                    # Also update activity codes? We'll generate new codes for the new items.
-                    # But activityCodes is a dict, we may need to append. For now, skip.
-        # Recalculate totalAmount
-        total = 0
-        for k in updated:
-            if isinstance(updated[k], dict) and "amount" in updated[k]:
-                total += updated[k]["amount"]
-        updated["totalAmount"] = total
-        # Keep clientID unchanged
-        updated["isArchived"] = False
-        await db.db["clients"].replace_one({"_id": existing["_id"]}, updated)
-        updated["id"] = str(updated["_id"])
-        return updated
-    else:
-        # New client
+    # Clients with the same name and phone (not archived) are merged
+    match = {"clientName": client_data.clientName, "phone": client_data.phone, "isArchived": False}
+    # Existing client: counts, amounts, minutes and totalAmount are added up
+    # server-side in a single round trip, so concurrent submissions can't lose updates
+    client = await db.db["clients"].find_one_and_update(
+        match, client_merge_pipeline(client_data), return_document=ReturnDocument.AFTER
+    )
+    op = "update"
+    if client is None:
+        # New client: a fresh ID starts every activity sequence at 1, so the codes
+        # need no counter reads and the create is the same atomic upsert
         client_id = await generate_client_id(db.db)
-        # Compute totalAmount from deliverables
-        total_amount = 0
-        # We'll build the client document from client_data
-        client_dict = client_data.dict()
-        for key in ["Web", "SEO", "Campaign", "Calls", "Posters", "Reels", "Shorts", "Longform", "Carousel", "EventDay", "Blog"]:
-            if key in client_dict and client_dict[key] and client_dict[key].get("count", 0) > 0:
-                # Ensure amount field is set (use 'amount' or 'amo')
-                item = client_dict[key]
-                if "amo" in item and "amount" not in item:
-                    item["amount"] = item["amo"]
-                total_amount += item.get("amount", 0)
-        client_dict["clientID"] = client_id
-        client_dict["totalAmount"] = total_amount
-        client_dict["isArchived"] = False
-        # Generate activity codes for each selected service
-        activity_codes = {}
-        for key in client_dict:
-            if key in ["Web", "SEO", "Campaign", "Calls", "Posters", "Reels", "Shorts", "Longform", "Carousel", "EventDay", "Blog"] and client_dict[key] and client_dict[key].get("count", 0) > 0:
-                # Count sequence? For now, we'll just use 1 because each service appears once per client.
-                activity_codes[key] = generate_activity_code(client_id, key, 1)
-        client_dict["activityCodes"] = activity_codes
+        activity_codes = {
+            key: generate_activity_code(client_id, key, 1)
+            for key in DELIVERABLE_KEYS if is_selected(getattr(client_data, key))
+        }
+        pipeline = client_merge_pipeline(client_data, client_id, activity_codes)
+        try:
+            client = await db.db["clients"].find_one_and_update(
+                match, pipeline, upsert=True, return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            # A concurrent request created the same client first; merge into it
+            client = await db.db["clients"].find_one_and_update(
+                match, client_merge_pipeline(client_data), return_document=ReturnDocument.AFTER
+            )
+        if client.get("clientID") == client_id:
+            op = "insert"
+    await bump_version(db.db, "clients")
+    publish_change("clients", op, client["_id"], data=client)
+    client["id"] = str(client["_id"])
+    return client
+
+@router.post("/import", response_model=ClientImportResult)
+async def import_clients_file(
+    request: Request,
+    fmt: Optional[str] = Query(None, alias="format", pattern="^(csv|ndjson)$"),
+    batch_size: int = Query(IMPORT_BATCH_SIZE, ge=1, le=5000),
+    current_user=Depends(get_current_user)
+):
+    # The raw body (CSV with a header row, or NDJSON) is parsed as it arrives,
+    # in the same layout GET /export/clients writes
+    if fmt is None:
+        fmt = "ndjson" if "ndjson" in request.headers.get("content-type", "") else "csv"
+    reader = read_csv_rows if fmt == "csv" else read_ndjson_rows
 
-        result = await db.db["clients"].insert_one(client_dict)
-        client_dict["id"] = str(result.inserted_id)
-        return client_dict
+    async def publish_inserted(docs):
+        for doc in docs:
+            publish_change("clients", "insert", doc["_id"], data=doc)
+
+    return await import_clients(db.db, reader(request.stream()), batch_size, on_inserted=publish_inserted)
+
+@router.post("/{client_id}/dispatch", response_model=List[TaskOut])
+async def dispatch_client(client_id: str, dispatch: ClientDispatch = ClientDispatch(), current_user=Depends(get_current_user)):
+    # Replaces one POST /tasks per team plus PUT /clients/{id}: the team tasks and
+    # the archive flag are written together or not at all
+    obj_id = ObjectId(client_id)
+    teams = dispatch.teams or list(TEAM_SERVICES)
+    unknown = [t for t in teams if t not in TEAM_SERVICES]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown team(s): {', '.join(unknown)}")
+    async with await db.client.start_session() as session:
+        async with session.start_transaction():
+            client = await db.db["clients"].find_one_and_update(
+                {"_id": obj_id, "isArchived": False},
+                {"$set": {"isArchived": True}},
+                return_document=ReturnDocument.BEFORE,
+                session=session
+            )
+            if not client:
+                raise HTTPException(status_code=404, detail="Client not found or already dispatched")
+            tasks = [t for t in (build_team_task(client, team) for team in teams) if t]
+            if not tasks:
+                raise HTTPException(status_code=400, detail="Client has no deliverables for the selected teams")
+            result = await db.db["tasks"].insert_many(tasks, session=session)
+    await record_tasks_created(db.db, tasks)
+    await bump_versions(db.db, ("clients", ()), ("tasks", [t["team"] for t in tasks]))
+    publish_change("clients", "update", obj_id, data={"isArchived": True})
+    for task in tasks:
+        publish_change("tasks", "insert", task["_id"], task["team"], task)
+    for task, inserted_id in zip(tasks, result.inserted_ids):
+        task["id"] = str(inserted_id)
+    return tasks
 
 @router.put("/{client_id}")
 async def update_client(client_id: str, update_data: dict, current_user = Depends(get_current_user)):
     try:
         obj_id = ObjectId(client_id)
-        await db.db["clients"].update_one({"_id": obj_id}, {"$set": update_data})
-        updated = await db.db["clients"].find_one({"_id": obj_id})
+        # Pipeline form so the search keys are recomputed from the updated fields
+        values = {k: {"$literal": v} for k, v in update_data.items()}
+        updated = await db.db["clients"].find_one_and_update(
+            {"_id": obj_id}, [{"$set": values}, {"$set": {"search": CLIENT_SEARCH_KEYS}}],
+            return_document=ReturnDocument.AFTER
+        )
         if not updated:
             raise HTTPException(status_code=404, detail="Client not found")
+        await bump_version(db.db, "clients")
+        publish_change("clients", "update", obj_id, data=update_data)
         # Convert ObjectId to string and remove it
         updated["id"] = str(updated["_id"])
         del updated["_id"]  # <-- critical: remove the ObjectId
         return updated
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error updating client {client_id}: {e}")
         import traceback
@@ -118,4 +163,6 @@ async def delete_client(client_id: str, current_user=Depends(get_current_user)):
     obj_id = ObjectId(client_id)
     # Also delete associated tasks? Not required; tasks may remain but should be handled.
     await db.db["clients"].delete_one({"_id": obj_id})
+    await bump_version(db.db, "clients")
+    publish_change("clients", "delete", obj_id)
     return {"message": "Client deleted"}
\ No newline at end of file
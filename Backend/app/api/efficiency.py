@@ -1,63 +1,24 @@
 from fastapi import APIRouter, Depends
+from typing import Optional
 from app.database import db
 from app.core.dependencies import get_current_user
+from app.utils.team_stats import COMPLETED_STATUSES, dict_values_sum, read_team_stats
+from app.utils.archive import TASKS_ARCHIVE
+from app.utils.helpers import delivery_window
 
 router = APIRouter(prefix="/efficiency", tags=["Efficiency"])
 
 @router.get("/teams")
 async def team_efficiency(current_user = Depends(get_current_user)):
-    # Aggregate tasks by team
-    pipeline = [
-        {
-            "$group": {
-                "_id": "$team",
-                "totalTasks": {"$sum": 1},
-                "completedTasks": {
-                    "$sum": {
-                        "$cond": [
-                            {"$or": [{"$eq": ["$status", "Completed"]}, {"$eq": ["$status", "Call Completed"]}]},
-                            1,
-                            0
-                        ]
-                    }
-                },
-                # For minutes-based efficiency, we need to sum minutes for completed vs total
-                "totalMinutes": {
-                    "$sum": {
-                        "$sum": {
-                            "$map": {
-                                "input": {"$objectToArray": "$minutes"},
-                                "as": "item",
-                                "in": "$$item.v"
-                            }
-                        }
-                    }
-                },
-                "completedMinutes": {
-                    "$sum": {
-                        "$cond": [
-                            {"$or": [{"$eq": ["$status", "Completed"]}, {"$eq": ["$status", "Call Completed"]}]},
-                            {"$sum": {
-                                "$map": {
-                                    "input": {"$objectToArray": "$minutes"},
-                                    "as": "item",
-                                    "in": "$$item.v"
-                                }
-                            }},
-                            0
-                        ]
-                    }
-                }
-            }
-        }
-    ]
-    cursor = db.db["tasks"].aggregate(pipeline)
-    results = await cursor.to_list(length=None)
+    # Read the team_stats rollup maintained by the task routes instead of
+    # aggregating the whole tasks collection on every page load
+    stats = await read_team_stats(db.db)
     # Format output
     efficiency_data = []
-    for row in results:
-        team = row["_id"]
+    for team, row in stats.items():
         total_tasks = row["totalTasks"]
+        if total_tasks <= 0:
+            continue
         completed_tasks = row["completedTasks"]
         total_minutes = row["totalMinutes"]
         completed_minutes = row["completedMinutes"]
@@ -72,4 +33,81 @@ async def team_efficiency(current_user = Depends(get_current_user)):
             "completed": completed_tasks,
             "efficiency": efficiency
         })
-    return efficiency_data
\ No newline at end of file
+    return efficiency_data
+
+def _performance_group(group_id):
+    completed = {"$in": ["$status", list(COMPLETED_STATUSES)]}
+    return {
+        "$group": {
+            "_id": group_id,
+            "totalTasks": {"$sum": 1},
+            "completedTasks": {"$sum": {"$cond": [completed, 1, 0]}},
+            "totalMinutes": {"$sum": dict_values_sum("minutes")},
+            "completedMinutes": {"$sum": {"$cond": [completed, dict_values_sum("minutes"), 0]}},
+            "totalAmount": {"$sum": dict_values_sum("amount")},
+            "completedAmount": {"$sum": {"$cond": [completed, dict_values_sum("amount"), 0]}},
+        }
+    }
+
+def _format_performance(row):
+    row = {k: v for k, v in row.items() if k != "_id"}
+    if row["totalMinutes"] > 0:
+        row["efficiency"] = round((row["completedMinutes"] / row["totalMinutes"]) * 100)
+    else:
+        row["efficiency"] = round((row["completedTasks"] / row["totalTasks"]) * 100) if row["totalTasks"] > 0 else 0
+    return row
+
+EMPTY_PERFORMANCE = {
+    "totalTasks": 0, "completedTasks": 0, "totalMinutes": 0, "completedMinutes": 0,
+    "totalAmount": 0, "completedAmount": 0, "efficiency": 0
+}
+
+async def _performance(match, per_employee=False, include_archived=False):
+    # One $facet pass over the matching tasks instead of shipping them to the browser
+    facets = {
+        "totals": [_performance_group(None)],
+        "byStatus": [{"$group": {"_id": "$status", "count": {"$sum": 1}}}],
+    }
+    if per_employee:
+        facets["employees"] = [_performance_group("$assignedTo"), {"$sort": {"_id": 1}}]
+    pipeline = [{"$match": match}]
+    if include_archived:
+        # The archive is filtered on its own side so it can use its indexes
+        pipeline.append({"$unionWith": {"coll": TASKS_ARCHIVE, "pipeline": [{"$match": match}]}})
+    pipeline.append({"$facet": facets})
+    result = (await db.db["tasks"].aggregate(pipeline).to_list(length=1))[0]
+    out = _format_performance(result["totals"][0]) if result["totals"] else dict(EMPTY_PERFORMANCE)
+    out["statusBreakdown"] = {row["_id"]: row["count"] for row in result["byStatus"] if row["_id"]}
+    if per_employee:
+        out["employees"] = [
+            {"empID": row["_id"], **_format_performance(row)} for row in result["employees"] if row["_id"]
+        ]
+    return out
+
+@router.get("/employees/{empID}")
+async def employee_performance(
+    empID: str,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    include_archived: bool = True,
+    current_user = Depends(get_current_user)
+):
+    match = {"assignedTo": empID}
+    window = delivery_window(date_from, date_to)
+    if window:
+        match["deliveryDate"] = window
+    return {"empID": empID, **(await _performance(match, include_archived=include_archived))}
+
+@router.get("/teams/{team}/employees")
+async def team_employee_performance(
+    team: str,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    include_archived: bool = True,
+    current_user = Depends(get_current_user)
+):
+    match = {"team": team, "assignedTo": {"$ne": None}}
+    window = delivery_window(date_from, date_to)
+    if window:
+        match["deliveryDate"] = window
+    return {"team": team, **(await _performance(match, per_employee=True, include_archived=include_archived))}
@@ -1,10 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Header, Query
+from typing import List, Optional
 from app.schemas.user import UserOut, UserCreate, UserUpdate
 from app.database import db
-from app.core.dependencies import get_current_user, get_current_admin_user
+from app.core.dependencies import get_current_user, get_current_admin_user, invalidate_cached_user
 from bson import ObjectId
-from app.core.security import get_password_hash
+from pymongo import ReturnDocument
+from app.core.security import get_password_hash_async
+from app.utils.pagination import fetch_page, select_fields, stream_ndjson
+from app.utils.encoding import wants_msgpack
+from app.utils.versions import bump_version, current_etag, etag_matches, not_modified, variant_etag, with_etag
 
 router = APIRouter(prefix="/employees", tags=["Employees"])
 
@@ -15,15 +19,28 @@ async def get_current_admin_user(current_user = Depends(get_current_user)):
     return current_user
 
 @router.get("/", response_model=List[UserOut])
-async def get_employees(team: str = None, current_user = Depends(get_current_user)):
+async def get_employees(
+    team: str = None,
+    limit: Optional[int] = Query(None, ge=1),
+    after: Optional[str] = None,
+    fields: Optional[str] = None,
+    stream: bool = False,
+    if_none_match: Optional[str] = Header(None),
+    accept: Optional[str] = Header(None),
+    current_user = Depends(get_current_user)
+):
+    names = select_fields(UserOut, fields)
+    etag = await current_etag(db.db, "users")
+    if wants_msgpack(accept):
+        etag = variant_etag(etag, "msgpack")
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
     query = {}
     if team:
         query["team"] = team
-    cursor = db.db["users"].find(query, {"hashed_password": 0})
-    users = await cursor.to_list(length=None)
-    for u in users:
-        u["id"] = str(u["_id"])
-    return users
+    if stream:
+        return with_etag(stream_ndjson(db.db["users"], query, UserOut, limit=limit, after=after, accept=accept, fields=names), etag)
+    return with_etag(await fetch_page(db.db["users"], query, UserOut, limit=limit, after=after, accept=accept, fields=names), etag)
 
 @router.get("/{emp_id}", response_model=UserOut)
 async def get_employee(emp_id: str, current_user = Depends(get_current_user)):
@@ -41,11 +58,12 @@ async def create_employee(employee: UserCreate, current_admin = Depends(get_curr
     if existing:
         raise HTTPException(status_code=400, detail="Employee ID or email already exists")
     # Hash password
-    hashed = get_password_hash(employee.password)
+    hashed = await get_password_hash_async(employee.password)
     user_dict = employee.dict(exclude={"password"})
     user_dict["hashed_password"] = hashed
     user_dict["is_admin"] = employee.is_admin or False
     result = await db.db["users"].insert_one(user_dict)
+    await bump_version(db.db, "users")
     user_dict["id"] = str(result.inserted_id)
     return user_dict
 
@@ -54,10 +72,19 @@ async def update_employee(emp_id: str, update_data: UserUpdate, current_admin =
     obj_id = ObjectId(emp_id)
     update_dict = {k: v for k, v in update_data.dict(exclude_unset=True).items() if v is not None}
     if "password" in update_dict:
-        update_dict["hashed_password"] = get_password_hash(update_dict.pop("password"))
+        update_dict["hashed_password"] = await get_password_hash_async(update_dict.pop("password"))
     if update_dict:
-        await db.db["users"].update_one({"_id": obj_id}, {"$set": update_dict})
-    updated = await db.db["users"].find_one({"_id": obj_id}, {"hashed_password": 0})
+        updated = await db.db["users"].find_one_and_update(
+            {"_id": obj_id}, {"$set": update_dict},
+            projection={"hashed_password": 0}, return_document=ReturnDocument.AFTER
+        )
+    else:
+        updated = await db.db["users"].find_one({"_id": obj_id}, {"hashed_password": 0})
+    if not updated:
+        raise HTTPException(status_code=404, detail="Employee not found")
+    if update_dict:
+        invalidate_cached_user(obj_id)
+        await bump_version(db.db, "users")
     updated["id"] = str(updated["_id"])
     return updated
 
@@ -65,4 +92,6 @@ async def update_employee(emp_id: str, update_data: UserUpdate, current_admin =
 async def delete_employee(emp_id: str, current_admin = Depends(get_current_admin_user)):
     obj_id = ObjectId(emp_id)
     await db.db["users"].delete_one({"_id": obj_id})
+    invalidate_cached_user(obj_id)
+    await bump_version(db.db, "users")
     return {"message": "Employee deleted"}
\ No newline at end of file
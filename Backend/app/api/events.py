@@ -0,0 +1,47 @@
+import asyncio
+import json
+from typing import Optional
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
+from app.config import settings
+from app.core.dependencies import get_stream_user
+from app.core.events import bus
+
+router = APIRouter(prefix="/events", tags=["Events"])
+
+def _format(event):
+    return f"event: {event['collection']}\ndata: {json.dumps(event, default=str)}\n\n"
+
+async def _event_stream(request: Request, sub):
+    try:
+        yield "retry: 5000\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(sub.queue.get(), timeout=settings.EVENTS_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                # Comment line keeps proxies from closing an idle connection
+                yield ": keep-alive\n\n"
+                continue
+            if event is None:
+                # Dropped for falling behind; the client reconnects and refetches
+                yield "event: dropped\ndata: {}\n\n"
+                break
+            yield _format(event)
+    finally:
+        bus.unsubscribe(sub)
+
+@router.get("/")
+async def stream_events(
+    request: Request,
+    team: Optional[str] = None,
+    collections: str = "tasks,clients",
+    current_user = Depends(get_stream_user)
+):
+    sub = bus.subscribe(team=team, collections=[c.strip() for c in collections.split(",") if c.strip()])
+    return StreamingResponse(
+        _event_stream(request, sub),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
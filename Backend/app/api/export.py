@@ -0,0 +1,95 @@
+from datetime import date
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
+from app.database import db
+from app.core.dependencies import get_current_user
+from app.utils.archive import ARCHIVES
+from app.utils.encoding import MSGPACK_MEDIA_TYPE, require_msgpack, wants_msgpack
+from app.utils.helpers import DELIVERABLE_KEYS, TEAM_SERVICES, delivery_window
+from app.utils.tabular import (
+    CLIENT_COLUMNS, CLIENT_FIELDS, TASK_COLUMNS, TASK_FIELDS, TASK_SERVICE_FIELDS,
+    csv_chunks, flatten_client, flatten_task, msgpack_chunks, ndjson_chunks
+)
+
+DEFAULT_BATCH_SIZE = 1000
+MAX_BATCH_SIZE = 10000
+
+router = APIRouter(prefix="/export", tags=["Export"])
+
+# Fields read from Mongo for each export; everything else (activityCodes, ...) stays on the server
+EXPORTS = {
+    "clients": {
+        "columns": CLIENT_COLUMNS,
+        "flatten": flatten_client,
+        "fields": [f for f in CLIENT_FIELDS if f != "id"] + DELIVERABLE_KEYS,
+    },
+    "tasks": {
+        "columns": TASK_COLUMNS,
+        "flatten": flatten_task,
+        "fields": [f for f in TASK_FIELDS if f not in ("id", "totalAmount")] + TASK_SERVICE_FIELDS,
+    },
+}
+
+def _export_query(resource, team, status, archived, date_from, date_to):
+    query = {}
+    if team:
+        if resource == "tasks":
+            query["team"] = team
+        elif team in TEAM_SERVICES:
+            # Clients belong to a team through the deliverables that team works on
+            query["$or"] = [{f"{s}.count": {"$gt": 0}} for s in TEAM_SERVICES[team]]
+        else:
+            raise HTTPException(status_code=400, detail=f"Unknown team: {team}")
+    if status:
+        if resource != "tasks":
+            raise HTTPException(status_code=400, detail="status filters tasks; use archived for clients")
+        query["status"] = {"$in": status}
+    if archived is not None:
+        if resource != "clients":
+            raise HTTPException(status_code=400, detail="archived filters clients")
+        query["isArchived"] = archived
+    window = delivery_window(date_from, date_to)
+    if window:
+        query["deliveryDate"] = window
+    return query
+
+@router.get("/{resource}")
+async def export(
+    resource: str,
+    fmt: Optional[str] = Query(None, alias="format", pattern="^(csv|ndjson|msgpack)$"),
+    team: Optional[str] = None,
+    status: Optional[List[str]] = Query(None),
+    archived: Optional[bool] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    include_archived: bool = True,
+    batch_size: int = Query(DEFAULT_BATCH_SIZE, ge=1, le=MAX_BATCH_SIZE),
+    accept: Optional[str] = Header(None),
+    current_user = Depends(get_current_user)
+):
+    spec = EXPORTS.get(resource)
+    if spec is None:
+        raise HTTPException(status_code=404, detail="Unknown export")
+    if fmt is None:
+        fmt = "msgpack" if wants_msgpack(accept) else "csv"
+    if fmt == "msgpack":
+        require_msgpack()
+    query = _export_query(resource, team, status, archived, date_from, date_to)
+    pipeline = [{"$match": query}]
+    if include_archived:
+        pipeline.append({"$unionWith": {"coll": ARCHIVES[resource], "pipeline": [{"$match": query}]}})
+    projection = {f: 1 for f in spec["fields"]}
+    projection["id"] = {"$toString": "$_id"}
+    projection["_id"] = 0
+    pipeline.append({"$project": projection})
+    # batchSize bounds what Motor holds per getMore; rows go out as they arrive
+    cursor = db.db[resource].aggregate(pipeline, batchSize=batch_size)
+    if fmt == "csv":
+        body, media_type = csv_chunks(cursor, spec["columns"], spec["flatten"], batch_size), "text/csv"
+    elif fmt == "msgpack":
+        body, media_type = msgpack_chunks(cursor, spec["flatten"], batch_size), MSGPACK_MEDIA_TYPE
+    else:
+        body, media_type = ndjson_chunks(cursor, spec["flatten"], batch_size), "application/x-ndjson"
+    filename = f"{resource}-{date.today().isoformat()}.{fmt}"
+    return StreamingResponse(body, media_type=media_type, headers={"Content-Disposition": f'attachment; filename="{filename}"'})
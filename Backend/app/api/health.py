@@ -1,5 +1,7 @@
 from fastapi import APIRouter, HTTPException
 from app.database import db
+from app.core.dependencies import user_cache
+from app.core.mongo_monitoring import pool_stats
 
 router = APIRouter(prefix="/health", tags=["System Health"])
 
@@ -7,7 +9,9 @@ router = APIRouter(prefix="/health", tags=["System Health"])
 async def health_check():
     health_status = {
         "status": "online",
-        "database": "disconnected"
+        "database": "disconnected",
+        "user_cache": user_cache.stats(),
+        "connection_pool": pool_stats.snapshot()
     }
     
     try:
@@ -0,0 +1,26 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.core.dependencies import user_cache
+from app.core.events import bus
+from app.core.metrics import Gauge, registry
+from app.core.mongo_monitoring import pool_stats
+
+router = APIRouter(prefix="/metrics", tags=["System Health"])
+
+mongo_pool = registry.register(Gauge("mongo_pool", "MongoDB connection pool state", ("stat",)))
+user_cache_stats = registry.register(Gauge("user_cache", "Authenticated-user cache state", ("stat",)))
+event_subscribers = registry.register(Gauge("events_subscribers", "Connected server-sent event subscribers"))
+
+def _collect():
+    for stat, value in pool_stats.snapshot().items():
+        mongo_pool.set(stat, value=value)
+    for stat, value in user_cache.stats().items():
+        user_cache_stats.set(stat, value=value)
+    event_subscribers.set(value=len(bus.subscribers))
+
+registry.collectors.append(_collect)
+
+@router.get("/", response_class=PlainTextResponse)
+async def metrics():
+    # Prometheus text exposition format
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,139 @@
+import asyncio
+import re
+from fastapi import APIRouter, Depends, Query
+from typing import Optional
+from app.database import db
+from app.core.dependencies import get_current_user
+from app.utils.archive import CLIENTS_ARCHIVE, TASKS_ARCHIVE
+
+router = APIRouter(prefix="/search", tags=["Search"])
+
+MAX_SEARCH_OFFSET = 500
+# Ranking tiers: an exact identifier or name beats an identifier prefix, then a
+# name prefix, an industry prefix and finally a word match ranked by $text relevance
+# (scaled below 1). Every tier is its own query on one of the lowercased keys in
+# app.utils.search_keys, read in the order of that key's (key, _id) index
+# (relevance order for $text), so $limit stops the index scan early.
+EXACT_SCORE = 100
+ID_PREFIX_SCORE = 50
+NAME_PREFIX_SCORE = 40
+INDUSTRY_PREFIX_SCORE = 10
+
+CLIENT_FIELDS = {"clientID": 1, "clientName": 1, "industry": 1, "email": 1, "phone": 1, "isArchived": 1}
+TASK_FIELDS = {"activityCode": 1, "clientID": 1, "client": 1, "team": 1, "status": 1}
+
+# Keys holding a list (a client's IDs, the words of its name)
+ARRAY_KEYS = {"search.ids", "search.words"}
+
+def _prefix(needle):
+    # Anchored and case-sensitive against lowercase keys: an index range scan
+    return re.compile("^" + re.escape(needle))
+
+def _client_tiers(needle):
+    # (score, key, exact value or prefix)
+    prefix = _prefix(needle)
+    return [
+        (EXACT_SCORE, "search.ids", needle),
+        (EXACT_SCORE, "search.name", needle),
+        (ID_PREFIX_SCORE, "search.ids", prefix),
+        (NAME_PREFIX_SCORE, "search.name", prefix),
+        (NAME_PREFIX_SCORE, "search.words", prefix),
+        (INDUSTRY_PREFIX_SCORE, "search.industry", prefix),
+    ]
+
+def _task_tiers(needle):
+    return [
+        (EXACT_SCORE, "search.code", needle),
+        (ID_PREFIX_SCORE, "search.code", _prefix(needle)),
+    ]
+
+def _rank(key, value):
+    # What a tier's rows are ordered by: the key itself, or for a list the first
+    # element that matched, which is where the index scan meets the document
+    if key not in ARRAY_KEYS:
+        return f"${key}"
+    if isinstance(value, re.Pattern):
+        cond = {"$regexMatch": {"input": "$$this", "regex": value}}
+    else:
+        cond = {"$eq": ["$$this", value]}
+    return {"$min": {"$filter": {"input": f"${key}", "cond": cond}}}
+
+def _tier_pipeline(archive, key, value, fields, n):
+    # The first n matches in (key, _id) order across the live collection and its
+    # archive. Each half is read off the (key, _id) index and stops after n rows. A
+    # list key is read in index order without a $sort: the server sorts lists by
+    # their smallest element, which the index can't supply under a prefix bound.
+    page = [{"$match": {key: value}}]
+    if key not in ARRAY_KEYS:
+        page.append({"$sort": {key: 1, "_id": 1}})
+    page += [{"$limit": n}, {"$project": {**fields, "rank": _rank(key, value)}}]
+    merge = [{"$sort": {"rank": 1, "_id": 1}}, {"$limit": n}, {"$unset": "rank"}]
+    return page + [{"$unionWith": {"coll": archive, "pipeline": page}}] + merge
+
+async def _tier_matches(collection, archive, key, value, fields, n):
+    return await db.db[collection].aggregate(_tier_pipeline(archive, key, value, fields, n)).to_list(length=n)
+
+async def _text_matches(q, n):
+    # Live and archived clients are searched side by side and merged by relevance
+    projection = {**CLIENT_FIELDS, "textScore": {"$meta": "textScore"}}
+
+    async def ranked(collection):
+        cursor = db.db[collection].find({"$text": {"$search": q}}, projection)
+        return await cursor.sort([("textScore", {"$meta": "textScore"})]).limit(n).to_list(length=n)
+
+    live, archived = await asyncio.gather(ranked("clients"), ranked(CLIENTS_ARCHIVE))
+    return sorted(live + archived, key=lambda doc: -doc["textScore"])[:n]
+
+def _relevance(doc):
+    score = doc.pop("textScore")
+    return score / (1 + score)
+
+async def _nothing():
+    return []
+
+@router.get("/")
+async def search(
+    q: str = Query(..., min_length=1, max_length=100),
+    kind: Optional[str] = Query(None, alias="type", pattern="^(clients|tasks)$"),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=MAX_SEARCH_OFFSET),
+    current_user = Depends(get_current_user)
+):
+    q = q.strip()
+    if not q:
+        return {"query": q, "offset": offset, "limit": limit, "hasMore": False, "results": []}
+    needle = q.lower()
+    # Results are the tiers one after another, each without what a better tier
+    # already returned. Reading n rows per tier is enough: a tier is only reached
+    # once the ones before it hold fewer than n rows, all of which were read.
+    n = offset + limit + 1
+    sources = []
+    if kind in (None, "clients"):
+        sources += [("client", score, "clients", CLIENTS_ARCHIVE, key, value, CLIENT_FIELDS) for score, key, value in _client_tiers(needle)]
+    if kind in (None, "tasks"):
+        sources += [("task", score, "tasks", TASKS_ARCHIVE, key, value, TASK_FIELDS) for score, key, value in _task_tiers(needle)]
+    # Stable sort: within a tier, clients before tasks
+    sources.sort(key=lambda source: -source[1])
+    *tier_docs, text_docs = await asyncio.gather(
+        *(_tier_matches(collection, archive, key, value, fields, n) for _, _, collection, archive, key, value, fields in sources),
+        _text_matches(q, n) if kind in (None, "clients") else _nothing(),
+    )
+
+    ranked = []
+    seen = set()
+
+    def add(result_type, docs, score_of):
+        for doc in docs:
+            if doc["_id"] not in seen:
+                seen.add(doc["_id"])
+                score = round(score_of(doc), 3)
+                ranked.append({"type": result_type, **doc, "score": score})
+
+    for (result_type, score, *_), docs in zip(sources, tier_docs):
+        add(result_type, docs, lambda doc: score)
+    add("client", text_docs, _relevance)
+
+    page = ranked[offset:offset + limit]
+    for entry in page:
+        entry["id"] = str(entry.pop("_id"))
+    return {"query": q, "offset": offset, "limit": limit, "hasMore": len(ranked) > offset + limit, "results": page}
@@ -1,9 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Header, Query
 from typing import List, Optional
-from app.schemas.task import TaskCreate, TaskUpdate, TaskOut
+from app.schemas.task import TaskCreate, TaskUpdate, TaskOut, TaskBulkUpdate, TaskBulkResult
 from app.database import db
 from app.core.dependencies import get_current_user
+from app.utils.pagination import fetch_page, select_fields, stream_ndjson
+from app.utils.encoding import wants_msgpack
+from app.core.events import publish_change
+from app.utils.versions import bump_version, bump_versions, current_etag, etag_matches, not_modified, variant_etag, with_etag
+from app.utils.team_stats import record_task_created, record_task_deleted, record_task_updated, record_tasks_updated
+from app.utils.archive import TASKS_ARCHIVE
+from app.utils.task_filters import build_task_query, parse_task_sort
+from app.utils.search_keys import task_search_keys
 from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, PyMongoError
+
+MAX_BULK_UPDATES = 1000
 
 router = APIRouter(prefix="/tasks", tags=["Tasks"])
 
@@ -11,18 +24,40 @@ router = APIRouter(prefix="/tasks", tags=["Tasks"])
 async def get_tasks(
     team: Optional[str] = None,
     assignedTo: Optional[str] = None,
+    status: Optional[List[str]] = Query(None),
+    clientID: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    overdue: bool = False,
+    sort: Optional[str] = None,
+    include_archived: bool = False,
+    limit: Optional[int] = Query(None, ge=1),
+    after: Optional[str] = None,
+    fields: Optional[str] = None,
+    stream: bool = False,
+    if_none_match: Optional[str] = Header(None),
+    accept: Optional[str] = Header(None),
     current_user = Depends(get_current_user)
 ):
-    query = {}
-    if team:
-        query["team"] = team
-    if assignedTo:
-        query["assignedTo"] = assignedTo
-    cursor = db.db["tasks"].find(query)
-    tasks = await cursor.to_list(length=None)
-    for t in tasks:
-        t["id"] = str(t["_id"])
-    return tasks
+    names = select_fields(TaskOut, fields)
+    order = parse_task_sort(sort)
+    query = build_task_query(team, assignedTo, status, clientID, date_from, date_to, overdue)
+    # Team pages get the team partition's version, so writes to other teams don't
+    # invalidate them; the version is read before the query so it can only be stale-low
+    etag = await current_etag(db.db, "tasks", team)
+    if overdue:
+        # "Overdue" also changes when the date does
+        etag = variant_etag(etag, query["deliveryDate"]["$lt"])
+    if wants_msgpack(accept):
+        etag = variant_etag(etag, "msgpack")
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    # Team pages list live work only; history views (the employee profile) pass
+    # include_archived=true to also get the finished tasks moved to tasks_archive
+    union = TASKS_ARCHIVE if include_archived else None
+    if stream:
+        return with_etag(stream_ndjson(db.db["tasks"], query, TaskOut, limit=limit, after=after, union=union, accept=accept, sort=order, fields=names), etag)
+    return with_etag(await fetch_page(db.db["tasks"], query, TaskOut, limit=limit, after=after, union=union, accept=accept, sort=order, fields=names), etag)
 
 @router.post("/", response_model=TaskOut)
 async def create_task(task_data: TaskCreate, current_user = Depends(get_current_user)):
@@ -31,7 +66,11 @@ async def create_task(task_data: TaskCreate, current_user = Depends(get_current_
     task_dict["status"] = "Pending"
     task_dict["remarks"] = ""
     task_dict["submissionLink"] = ""
+    task_dict["search"] = task_search_keys(task_dict)
     result = await db.db["tasks"].insert_one(task_dict)
+    await record_task_created(db.db, task_dict)
+    await bump_version(db.db, "tasks", [task_dict["team"]])
+    publish_change("tasks", "insert", result.inserted_id, task_dict["team"], task_dict)
     task_dict["id"] = str(result.inserted_id)
     # Optionally, update client to archived (if task is created from dashboard)
     # The frontend currently archives the client after sending to a team.
@@ -39,6 +78,112 @@ async def create_task(task_data: TaskCreate, current_user = Depends(get_current_
     # For now, we'll not auto-archive; frontend will call update client.
     return task_dict
 
+def _reflects(doc, before, update_dict):
+    # Whether a re-read task carries this item's update: its fields, and the status
+    # the update left (its own, or the pre-read one it was guarded on)
+    status = update_dict.get("status", before.get("status"))
+    return doc.get("status") == status and all(doc.get(k) == v for k, v in update_dict.items())
+
+@router.patch("/bulk", response_model=TaskBulkResult)
+async def bulk_update_tasks(updates: List[TaskBulkUpdate], current_user = Depends(get_current_user)):
+    # One $in read of the tasks' current status, then one unordered bulk_write whose
+    # ops are guarded on that status, so team_stats moves by exactly what was
+    # replaced. A task whose status changed in between is left alone and reported
+    # as a conflict.
+    if len(updates) > MAX_BULK_UPDATES:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_UPDATES} updates per request")
+    results = [None] * len(updates)
+    pending = []
+    seen = set()
+    for index, item in enumerate(updates):
+        update_dict = {k: v for k, v in item.dict(exclude={"id"}).items() if v is not None}
+        try:
+            obj_id = ObjectId(item.id)
+        except (InvalidId, TypeError):
+            results[index] = {"id": item.id, "status": "invalid", "detail": "Invalid task id"}
+            continue
+        if obj_id in seen:
+            results[index] = {"id": item.id, "status": "invalid", "detail": "Duplicate task id in batch"}
+            continue
+        if not update_dict:
+            results[index] = {"id": item.id, "status": "invalid", "detail": "Nothing to update"}
+            continue
+        seen.add(obj_id)
+        pending.append((index, obj_id, update_dict))
+
+    fields = {"team": 1, "status": 1, "minutes": 1}
+    for _, _, update_dict in pending:
+        fields.update(dict.fromkeys(update_dict, 1))
+
+    async def read(ids):
+        docs = await db.db["tasks"].find({"_id": {"$in": ids}}, fields).to_list(length=None)
+        return {doc["_id"]: doc for doc in docs}
+
+    current = await read([obj_id for _, obj_id, _ in pending]) if pending else {}
+    ops, written = [], []
+    for index, obj_id, update_dict in pending:
+        before = current.get(obj_id)
+        if before is None:
+            results[index] = {"id": updates[index].id, "status": "not_found"}
+            continue
+        ops.append(UpdateOne({"_id": obj_id, "status": before.get("status")}, {"$set": update_dict}))
+        written.append((index, obj_id, update_dict, before))
+
+    landed, unsure, error = [], [], None
+    if ops:
+        failed = {}
+        try:
+            result = await db.db["tasks"].bulk_write(ops, ordered=False)
+            matched = result.matched_count
+        except BulkWriteError as e:
+            failed = {err["index"]: err.get("errmsg") for err in e.details.get("writeErrors", [])}
+            matched = e.details.get("nMatched")
+        except PyMongoError as e:
+            # Some ops may have run before the error; the re-read below finds out which
+            matched, error = None, e
+        for position, op in enumerate(written):
+            if position in failed:
+                results[op[0]] = {"id": updates[op[0]].id, "status": "error", "detail": failed[position]}
+        attempted = [op for position, op in enumerate(written) if position not in failed]
+        if matched == len(attempted):
+            landed = attempted
+        else:
+            # A guard missed somewhere (or the outcome is unknown): re-read just these
+            unsure = attempted
+
+    if unsure:
+        try:
+            reread = await read([obj_id for _, obj_id, _, _ in unsure])
+        except PyMongoError as e:
+            reread, error = None, e
+        for op in unsure:
+            index, obj_id, update_dict, before = op
+            doc = reread.get(obj_id) if reread is not None else None
+            if reread is None:
+                results[index] = {"id": updates[index].id, "status": "error", "detail": str(error)}
+            elif doc is None:
+                results[index] = {"id": updates[index].id, "status": "not_found"}
+            elif _reflects(doc, before, update_dict):
+                landed.append(op)
+            else:
+                results[index] = {"id": updates[index].id, "status": "conflict", "detail": "Task status changed during the update"}
+
+    # Bookkeeping for every write that landed, whatever happened to the rest
+    modified = 0
+    changes = []
+    for index, obj_id, update_dict, before in landed:
+        results[index] = {"id": updates[index].id, "status": "updated"}
+        if any(before.get(k) != v for k, v in update_dict.items()):
+            modified += 1
+        changes.append((before, {**before, **update_dict}))
+    await record_tasks_updated(db.db, changes)
+    if changes:
+        await bump_version(db.db, "tasks", [after.get("team") for _, after in changes])
+    for index, obj_id, update_dict, before in landed:
+        publish_change("tasks", "update", obj_id, before.get("team"), update_dict)
+
+    return {"matched": len(landed), "modified": modified, "results": results}
+
 @router.put("/{task_id}", response_model=TaskOut)
 async def update_task(task_id: str, update_data: TaskUpdate, current_user = Depends(get_current_user)):
     obj_id = ObjectId(task_id)
@@ -47,36 +192,51 @@ async def update_task(task_id: str, update_data: TaskUpdate, current_user = Depe
     if not update_dict:
         # nothing to update
         task = await db.db["tasks"].find_one({"_id": obj_id})
+        if not task:
+            raise HTTPException(status_code=404, detail="Task not found")
         task["id"] = str(task["_id"])
         return task
-    await db.db["tasks"].update_one({"_id": obj_id}, {"$set": update_dict})
-    updated = await db.db["tasks"].find_one({"_id": obj_id})
+    # The previous status is needed to keep the team_stats rollup in step. The route
+    # costs this write, a team_stats $inc when the status crosses the completed
+    # boundary and the version bump; tests/test_command_counts.py pins that count.
+    before = await db.db["tasks"].find_one_and_update(
+        {"_id": obj_id}, {"$set": update_dict}, return_document=ReturnDocument.BEFORE
+    )
+    if not before:
+        raise HTTPException(status_code=404, detail="Task not found")
+    updated = {**before, **update_dict}
+    await record_task_updated(db.db, before, updated)
+    await bump_version(db.db, "tasks", [updated.get("team")])
+    publish_change("tasks", "update", obj_id, updated.get("team"), update_dict)
     updated["id"] = str(updated["_id"])
     return updated
 
 @router.delete("/{task_id}")
 async def delete_task(task_id: str, current_user = Depends(get_current_user)):
     obj_id = ObjectId(task_id)
-    # Get task to retrieve clientID and amounts
-    task = await db.db["tasks"].find_one({"_id": obj_id})
+    # Delete and get the task (clientID and amounts) in one call
+    task = await db.db["tasks"].find_one_and_delete({"_id": obj_id})
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
+    await record_task_deleted(db.db, task)
     # Subtract task amount from client's totalAmount
-    client = await db.db["clients"].find_one({"clientID": task["clientID"]})
-    if client:
-        # Calculate total amount of task (sum of amount values)
-        task_total = 0
-        if task.get("amount"):
-            task_total = sum(task["amount"].values())
-        # Update client: subtract amount and reset the relevant service fields
-        new_total = max(0, client.get("totalAmount", 0) - task_total)
-        await db.db["clients"].update_one(
-            {"_id": client["_id"]},
-            {"$set": {"totalAmount": new_total}}
+    task_total = sum(v for v in (task.get("amount") or {}).values() if v)
+    client = None
+    if task_total:
+        # Clamped at zero on the server, so no read-modify-write of the client
+        client = await db.db["clients"].find_one_and_update(
+            {"clientID": task["clientID"]},
+            [{"$set": {"totalAmount": {"$max": [0, {"$subtract": [{"$ifNull": ["$totalAmount", 0]}, task_total]}]}}}],
+            projection={"totalAmount": 1},
+            return_document=ReturnDocument.AFTER
         )
         # Also reset service fields for that team? The frontend resets specific fields.
         # We'll need to identify which service fields correspond to this task's team.
         # For simplicity, we'll just update totalAmount; resetting service fields can be done later if needed.
-    # Delete task
-    await db.db["tasks"].delete_one({"_id": obj_id})
+    # Both versions in one write when the client total moved too
+    changed = [("tasks", [task.get("team")])] + ([("clients", ())] if client else [])
+    await bump_versions(db.db, *changed)
+    publish_change("tasks", "delete", obj_id, task.get("team"))
+    if client:
+        publish_change("clients", "update", client["_id"], data={"totalAmount": client["totalAmount"]})
     return {"message": "Task deleted"}
\ No newline at end of file
@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic_settings import BaseSettings
 from dotenv import load_dotenv
 
@@ -9,6 +10,33 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # Motor connection pool; MONGO_COMPRESSORS is a comma list such as "zstd,snappy"
+    # (needs the zstandard / python-snappy packages)
+    MONGO_MAX_POOL_SIZE: int = 100
+    MONGO_MIN_POOL_SIZE: int = 10
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: Optional[int] = None
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = 10000
+    MONGO_COMPRESSORS: str = ""
+    # Authenticated-user cache used by get_current_user
+    USER_CACHE_TTL_SECONDS: float = 60
+    USER_CACHE_MAX_SIZE: int = 1024
+    # bcrypt cost and the number of threads allowed to hash at once
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    # Server-sent events: per-subscriber queue bound, keep-alive interval and
+    # whether to read changes from a MongoDB change stream (replica set only)
+    EVENTS_QUEUE_SIZE: int = 100
+    EVENTS_HEARTBEAT_SECONDS: float = 15
+    EVENTS_CHANGE_STREAMS: bool = False
+    # Archival: archived clients and finished tasks whose deliveryDate is older
+    # than this many days move to clients_archive / tasks_archive
+    ARCHIVE_AFTER_DAYS: int = 180
+    ARCHIVE_BATCH_SIZE: int = 1000
+    # Response compression: bodies under COMPRESSION_MIN_SIZE bytes go out as is.
+    # brotli is used when the brotli package is installed and the client accepts it.
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,149 @@
+import time
+import zlib
+from starlette.datastructures import MutableHeaders
+from app.core.metrics import http_compression_bytes, http_compression_cpu, http_compression_ratio, http_compression_skipped
+
+# brotli is optional; without it clients get gzip
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Already compressed, or must reach the client unbuffered
+SKIP_CONTENT_TYPES = ("text/event-stream", "image/", "video/", "audio/", "application/zip", "application/gzip")
+
+
+class _Gzip:
+    def __init__(self, level):
+        self._obj = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        return self._obj.compress(data)
+
+    def finish(self):
+        return self._obj.flush(zlib.Z_FINISH)
+
+
+class _Brotli:
+    def __init__(self, quality):
+        self._obj = brotli.Compressor(quality=quality)
+
+    def compress(self, data):
+        return self._obj.process(data)
+
+    def finish(self):
+        return self._obj.finish()
+
+
+def _accepted_encodings(header):
+    accepted = set()
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        if "q=0" in params.replace(" ", "").split(";"):
+            continue
+        accepted.add(name.strip().lower())
+    return accepted
+
+
+class CompressionMiddleware:
+    """Pure ASGI middleware: brotli or gzip by Accept-Encoding, above a size threshold.
+
+    Single-message bodies under minimum_size are sent as is. Streamed bodies are
+    compressed chunk by chunk. Ratio, bytes and CPU time go to the metrics registry.
+    """
+
+    def __init__(self, app, minimum_size=1024, gzip_level=6, brotli_quality=4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def _choose(self, scope):
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accepted = _accepted_encodings(value.decode("latin-1"))
+                if brotli is not None and "br" in accepted:
+                    return "br"
+                if "gzip" in accepted:
+                    return "gzip"
+        return None
+
+    def _compressor(self, encoding):
+        return _Brotli(self.brotli_quality) if encoding == "br" else _Gzip(self.gzip_level)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        encoding = self._choose(scope)
+        if encoding is None:
+            return await self.app(scope, receive, send)
+
+        state = {"start": None, "compressor": None, "passthrough": False, "in": 0, "out": 0, "cpu": 0.0}
+
+        def compress(data, final=False):
+            started = time.thread_time()
+            out = state["compressor"].compress(data) if data else b""
+            if final:
+                out += state["compressor"].finish()
+            state["cpu"] += time.thread_time() - started
+            state["in"] += len(data)
+            state["out"] += len(out)
+            return out
+
+        def record():
+            route = getattr(scope.get("route"), "path_format", None) or "unmatched"
+            http_compression_bytes.inc(encoding, "in", amount=state["in"])
+            http_compression_bytes.inc(encoding, "out", amount=state["out"])
+            http_compression_cpu.inc(encoding, amount=state["cpu"])
+            if state["out"]:
+                http_compression_ratio.observe(route, encoding, value=state["in"] / state["out"])
+
+        def skip(reason):
+            state["passthrough"] = True
+            http_compression_skipped.inc(reason)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                if "content-encoding" in headers or message["status"] in (204, 304):
+                    skip("not_applicable")
+                elif headers.get("content-type", "").startswith(SKIP_CONTENT_TYPES):
+                    skip("content_type")
+                if state["passthrough"]:
+                    return await send(message)
+                # Held back until the first body chunk shows whether to compress
+                state["start"] = message
+                return
+            if message["type"] != "http.response.body" or state["passthrough"]:
+                return await send(message)
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if state["compressor"] is None:
+                start = state["start"]
+                if not more_body and len(body) < self.minimum_size:
+                    skip("below_threshold")
+                    await send(start)
+                    return await send(message)
+                state["compressor"] = self._compressor(encoding)
+                headers = MutableHeaders(scope=start)
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                if more_body:
+                    del headers["content-length"]
+                else:
+                    body = compress(body, final=True)
+                    headers["Content-Length"] = str(len(body))
+                    await send(start)
+                    await send({"type": "http.response.body", "body": body})
+                    return record()
+                await send(start)
+
+            chunk = compress(body, final=not more_body)
+            # zlib/brotli buffer small inputs; empty chunks are not worth a send
+            if chunk or not more_body:
+                await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+            if not more_body:
+                record()
+
+        await self.app(scope, receive, send_wrapper)
@@ -1,10 +1,21 @@
-from fastapi import Depends, HTTPException, status
+from typing import Optional
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError
 from app.core.security import decode_token
+from app.core.cache import TTLCache
+from app.config import settings
 from app.database import db
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login", auto_error=False)
+
+# User documents by empID, so protected routes don't pay an extra round trip each
+user_cache = TTLCache(maxsize=settings.USER_CACHE_MAX_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS)
+
+def invalidate_cached_user(obj_id):
+    # Admin writes address users by _id; the empID may itself have just changed
+    user_cache.invalidate_where(lambda user: user["_id"] == obj_id)
 
 async def get_current_user(token: str = Depends(oauth2_scheme)):
     payload = decode_token(token)
@@ -17,10 +28,24 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
     empID: str = payload.get("sub")
     if empID is None:
         raise HTTPException(status_code=401, detail="Invalid token")
-    user = await db.db["users"].find_one({"empID": empID})
+    user = user_cache.get(empID)
     if user is None:
-        raise HTTPException(status_code=401, detail="User not found")
-    return user
+        user = await db.db["users"].find_one({"empID": empID})
+        if user is None:
+            raise HTTPException(status_code=401, detail="User not found")
+        user_cache.set(empID, user)
+    # Routes add keys like "id" to the user; keep the cached copy clean
+    return dict(user)
+
+async def get_stream_user(
+    token: Optional[str] = Depends(optional_oauth2_scheme),
+    access_token: Optional[str] = Query(None)
+):
+    # EventSource can't set an Authorization header, so streams may pass the token in the query
+    token = token or access_token
+    if not token:
+        raise HTTPException(status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+    return await get_current_user(token)
 
 async def get_current_admin_user(current_user = Depends(get_current_user)):
     if not current_user.get("is_admin", False):
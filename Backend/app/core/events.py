@@ -0,0 +1,119 @@
+import asyncio
+from typing import Optional
+from pymongo.errors import OperationFailure, PyMongoError
+from app.config import settings
+from app.database import db
+
+
+class Subscriber:
+    def __init__(self, team: Optional[str], collections, maxsize: int):
+        self.team = team
+        self.collections = set(collections)
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = False
+
+    def wants(self, event):
+        if event["collection"] not in self.collections:
+            return False
+        # Only task events carry a team; client events reach every subscriber
+        return self.team is None or event.get("team") in (None, self.team)
+
+
+class EventBus:
+    """In-process pub/sub feeding the SSE endpoint.
+
+    Each subscriber has a bounded queue; one that falls behind is dropped instead
+    of making publishers wait or letting its backlog grow without limit.
+    """
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self.subscribers = set()
+        # "routes" while the write routes publish, "change_stream" once Mongo does
+        self.source = "routes"
+
+    def subscribe(self, team=None, collections=("tasks", "clients")):
+        sub = Subscriber(team, collections, self.queue_size)
+        self.subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub):
+        self.subscribers.discard(sub)
+
+    def publish(self, event):
+        for sub in list(self.subscribers):
+            if not sub.wants(event):
+                continue
+            try:
+                sub.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self._drop(sub)
+
+    def _drop(self, sub):
+        self.unsubscribe(sub)
+        sub.dropped = True
+        # Make room for the sentinel that tells the stream to close
+        while not sub.queue.empty():
+            sub.queue.get_nowait()
+        sub.queue.put_nowait(None)
+
+
+bus = EventBus(queue_size=settings.EVENTS_QUEUE_SIZE)
+
+
+def _jsonable(doc):
+    if doc is None:
+        return None
+    out = {k: v for k, v in doc.items() if k != "_id"}
+    if "_id" in doc:
+        out["id"] = str(doc["_id"])
+    return out
+
+
+def publish_change(collection, op, doc_id, team=None, data=None):
+    # Called by the write routes; skipped when the change stream is the source
+    if bus.source != "routes":
+        return
+    bus.publish({"collection": collection, "op": op, "id": str(doc_id), "team": team, "data": _jsonable(data)})
+
+
+async def watch_changes(database):
+    # Optional source: needs a replica set. Falls back to route publishing otherwise.
+    pipeline = [{"$match": {"ns.coll": {"$in": ["tasks", "clients"]}}}]
+    ops = {"insert": "insert", "update": "update", "replace": "update", "delete": "delete"}
+    try:
+        async with database.watch(pipeline, full_document="updateLookup") as stream:
+            bus.source = "change_stream"
+            print("Publishing events from MongoDB change streams.")
+            async for change in stream:
+                op = ops.get(change["operationType"])
+                if op is None:
+                    continue
+                doc = change.get("fullDocument")
+                bus.publish({
+                    "collection": change["ns"]["coll"],
+                    "op": op,
+                    "id": str(change["documentKey"]["_id"]),
+                    "team": doc.get("team") if doc else None,
+                    "data": _jsonable(doc),
+                })
+    except OperationFailure as e:
+        print(f"Change streams unavailable, publishing events from routes: {e}")
+    except PyMongoError as e:
+        print(f"Change stream stopped, publishing events from routes: {e}")
+    finally:
+        bus.source = "routes"
+
+
+_watch_task = None
+
+
+async def start_change_stream():
+    global _watch_task
+    if settings.EVENTS_CHANGE_STREAMS:
+        _watch_task = asyncio.create_task(watch_changes(db.db))
+
+
+async def stop_change_stream():
+    if _watch_task is not None:
+        _watch_task.cancel()
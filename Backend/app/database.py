@@ -1,5 +1,12 @@
+import asyncio
 from motor.motor_asyncio import AsyncIOMotorClient
 from .config import settings
+from .core.metrics import command_timings
+from .core.mongo_monitoring import pool_stats
+from .indexes import ensure_indexes
+from .utils.search_keys import ensure_search_keys
+from .utils.sequences import ensure_counters
+from .utils.team_stats import ensure_team_stats
 
 class Database:
     client: AsyncIOMotorClient = None
@@ -7,10 +14,33 @@ class Database:
 
 db = Database()
 
+def client_options():
+    options = {
+        "maxPoolSize": settings.MONGO_MAX_POOL_SIZE,
+        "minPoolSize": settings.MONGO_MIN_POOL_SIZE,
+        "serverSelectionTimeoutMS": settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "event_listeners": [pool_stats, command_timings],
+    }
+    if settings.MONGO_WAIT_QUEUE_TIMEOUT_MS is not None:
+        options["waitQueueTimeoutMS"] = settings.MONGO_WAIT_QUEUE_TIMEOUT_MS
+    if settings.MONGO_COMPRESSORS:
+        options["compressors"] = settings.MONGO_COMPRESSORS
+    return options
+
+async def warm_pool():
+    # Concurrent pings each check out their own connection, so the first burst
+    # of requests after a deploy doesn't pay for connection setup
+    await asyncio.gather(*(db.client.admin.command("ping") for _ in range(max(1, settings.MONGO_MIN_POOL_SIZE))))
+
 async def connect_to_mongo():
-    db.client = AsyncIOMotorClient(settings.MONGO_URI)
+    db.client = AsyncIOMotorClient(settings.MONGO_URI, **client_options())
     db.db = db.client[settings.DB_NAME]
+    await warm_pool()
     print("Connected to MongoDB.")
+    await ensure_indexes(db.db)
+    await ensure_counters(db.db)
+    await ensure_team_stats(db.db)
+    await ensure_search_keys(db.db)
 
 async def close_mongo_connection():
     db.client.close()
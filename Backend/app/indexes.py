@@ -0,0 +1,136 @@
+from pymongo import ASCENDING, TEXT, IndexModel
+from pymongo.errors import OperationFailure
+
+# /search, on the live and the archive collections: the lowercased keys from
+# app.utils.search_keys (exact and anchored-prefix matches, _id for the order each
+# tier is read in), plus a text index for word matches and relevance, with no
+# stemming or stop words for names
+CLIENT_SEARCH_INDEXES = [
+    IndexModel([("search.ids", ASCENDING), ("_id", ASCENDING)], name="search_ids"),
+    IndexModel([("search.name", ASCENDING), ("_id", ASCENDING)], name="search_name"),
+    IndexModel([("search.words", ASCENDING), ("_id", ASCENDING)], name="search_words"),
+    IndexModel([("search.industry", ASCENDING), ("_id", ASCENDING)], name="search_industry"),
+    IndexModel(
+        [("clientName", TEXT), ("industry", TEXT), ("email", TEXT)],
+        name="search_text",
+        weights={"clientName": 10, "email": 5, "industry": 2},
+        default_language="none",
+    ),
+]
+TASK_SEARCH_INDEX = IndexModel([("search.code", ASCENDING), ("_id", ASCENDING)], name="search_code")
+
+# GET /tasks filters and sorts: the equality fields first, then the order the page
+# is read in (deliveryDate, or nothing for the default _id order), then _id for the
+# keyset tie-break, so every shape in app.utils.task_filters.TASK_QUERY_SHAPES is
+# read in index order with no in-memory sort. A status list becomes one merged scan
+# per status. tasks_archive gets the same set, since include_archived runs every
+# shape against it through $unionWith.
+TASK_FILTER_INDEXES = [
+    IndexModel([("deliveryDate", ASCENDING), ("_id", ASCENDING)], name="deliveryDate_id"),
+    IndexModel([("status", ASCENDING), ("_id", ASCENDING)], name="status_id"),
+    # also the archival scan (finished tasks past the retention age)
+    IndexModel([("status", ASCENDING), ("deliveryDate", ASCENDING), ("_id", ASCENDING)], name="status_deliveryDate_id"),
+    IndexModel([("team", ASCENDING), ("status", ASCENDING), ("_id", ASCENDING)], name="team_status_id"),
+    IndexModel([("team", ASCENDING), ("deliveryDate", ASCENDING), ("_id", ASCENDING)], name="team_deliveryDate_id"),
+    IndexModel(
+        [("team", ASCENDING), ("status", ASCENDING), ("deliveryDate", ASCENDING), ("_id", ASCENDING)],
+        name="team_status_deliveryDate_id",
+    ),
+    # also the per-employee performance aggregation
+    IndexModel([("assignedTo", ASCENDING), ("status", ASCENDING), ("_id", ASCENDING)], name="assignedTo_status_id"),
+    IndexModel(
+        [("assignedTo", ASCENDING), ("deliveryDate", ASCENDING), ("_id", ASCENDING)],
+        name="assignedTo_deliveryDate_id",
+    ),
+    IndexModel([("clientID", ASCENDING), ("_id", ASCENDING)], name="clientID_id"),
+    IndexModel([("clientID", ASCENDING), ("deliveryDate", ASCENDING), ("_id", ASCENDING)], name="clientID_deliveryDate_id"),
+]
+
+# Index registry: every access path the routers use, per collection.
+# Names are fixed so re-running on startup is a no-op once they exist.
+INDEXES = {
+    "users": [
+        # get_current_user runs on every authenticated request
+        IndexModel([("empID", ASCENDING)], name="empID_unique", unique=True),
+        # login lookup
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+        # /employees?team= (with _id for keyset pagination)
+        IndexModel([("team", ASCENDING), ("_id", ASCENDING)], name="team_id"),
+    ],
+    "clients": [
+        # /clients?archived= (with _id for keyset pagination)
+        IndexModel([("isArchived", ASCENDING), ("_id", ASCENDING)], name="isArchived_id"),
+        # duplicate check in create_client; archived copies may repeat, active ones may not
+        IndexModel(
+            [("clientName", ASCENDING), ("phone", ASCENDING), ("isArchived", ASCENDING)],
+            name="active_client_unique",
+            unique=True,
+            partialFilterExpression={"isArchived": False},
+        ),
+        # delete_task and per-client lookups by clientID
+        IndexModel([("clientID", ASCENDING)], name="clientID"),
+    ] + CLIENT_SEARCH_INDEXES,
+    "tasks": [
+        # team pages
+        IndexModel([("team", ASCENDING), ("_id", ASCENDING)], name="team_id"),
+        # employee profile
+        IndexModel([("assignedTo", ASCENDING), ("_id", ASCENDING)], name="assignedTo_id"),
+        # /search by activity code
+        TASK_SEARCH_INDEX,
+    ] + TASK_FILTER_INDEXES,
+    # History moved out by the archival stage; read through $unionWith with the
+    # same filters as the live collections
+    "clients_archive": [
+        IndexModel([("isArchived", ASCENDING), ("_id", ASCENDING)], name="isArchived_id"),
+        IndexModel([("clientID", ASCENDING)], name="clientID"),
+        # archive run: settling and resuming a batch
+        IndexModel([("archive.batch", ASCENDING)], name="archive_batch"),
+    ] + CLIENT_SEARCH_INDEXES,
+    "tasks_archive": [
+        IndexModel([("team", ASCENDING), ("_id", ASCENDING)], name="team_id"),
+        IndexModel([("assignedTo", ASCENDING), ("_id", ASCENDING)], name="assignedTo_id"),
+        IndexModel([("archive.batch", ASCENDING)], name="archive_batch"),
+        TASK_SEARCH_INDEX,
+    ] + TASK_FILTER_INDEXES,
+}
+
+
+async def ensure_indexes(database):
+    # One index at a time so a single conflict doesn't skip the rest; returns the
+    # (collection, index name, error) of each one that could not be created
+    failed = []
+    for collection, models in INDEXES.items():
+        for model in models:
+            name = model.document["name"]
+            try:
+                await database[collection].create_indexes([model])
+            except OperationFailure as e:
+                # Usually existing data violates a unique index or an index with the same
+                # name has different options; don't block startup on it, `check` will show it.
+                print(f"Could not create index {name} on {collection}: {e}")
+                failed.append((collection, name, str(e)))
+    return failed
+
+
+async def check_indexes(database):
+    # Returns {collection: {"missing": [...], "unused": [...], "undeclared": [...]}}
+    report = {}
+    for collection, models in INDEXES.items():
+        declared = {m.document["name"] for m in models}
+        existing = set()
+        async for idx in database[collection].list_indexes():
+            existing.add(idx["name"])
+        unused = []
+        try:
+            async for stat in database[collection].aggregate([{"$indexStats": {}}]):
+                if stat["name"] != "_id_" and stat["accesses"]["ops"] == 0:
+                    unused.append(stat["name"])
+        except OperationFailure:
+            # $indexStats needs extra privileges on some hosted tiers
+            pass
+        report[collection] = {
+            "missing": sorted(declared - existing),
+            "unused": sorted(unused),
+            "undeclared": sorted(existing - declared - {"_id_"}),
+        }
+    return report
@@ -1,8 +1,14 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.database import connect_to_mongo, close_mongo_connection
+from app.core.security import shutdown_hash_executor
+from app.core.events import start_change_stream, stop_change_stream
+from app.core.metrics import MetricsMiddleware
+from app.core.compression import CompressionMiddleware
+from app.config import settings
 from app.api import auth, clients, tasks, employees, efficiency
 from app.api import auth, clients, tasks, employees, efficiency, health # Add health here
+from app.api import events, metrics, export, search
 
 app = FastAPI(title="Reach Skyline CRM API")
 
@@ -15,11 +21,23 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],  # keyset pagination cursor and list versions
 )
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MIN_SIZE,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+)
+# Outermost, so latency covers every other middleware too (and sizes are on-the-wire)
+app.add_middleware(MetricsMiddleware)
 
 # Event handlers for DB connection
 app.add_event_handler("startup", connect_to_mongo)
+app.add_event_handler("startup", start_change_stream)
+app.add_event_handler("shutdown", stop_change_stream)
 app.add_event_handler("shutdown", close_mongo_connection)
+app.add_event_handler("shutdown", shutdown_hash_executor)
 
 # Include routers
 app.include_router(auth.router, prefix="/api")
@@ -28,6 +46,10 @@ app.include_router(tasks.router, prefix="/api")
 app.include_router(employees.router, prefix="/api")
 app.include_router(efficiency.router, prefix="/api")
 app.include_router(health.router, prefix="/api")
+app.include_router(events.router, prefix="/api")
+app.include_router(metrics.router, prefix="/api")
+app.include_router(export.router, prefix="/api")
+app.include_router(search.router, prefix="/api")
 
 @app.get("/")
 async def root():
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, Dict
+from typing import Optional, Dict, List
 
 class ClientBase(BaseModel):
     clientName: str
@@ -21,6 +21,22 @@ class ClientCreate(ClientBase):
     EventDay: Optional[Dict] = None
     Blog: Optional[Dict] = None
 
+class ClientDispatch(BaseModel):
+    # Teams to send the client to; defaults to every team with a deliverable
+    teams: Optional[List[str]] = None
+
+class ClientImportRowError(BaseModel):
+    row: int  # data row number in the uploaded file, header excluded
+    status: str  # invalid, duplicate, error
+    detail: Optional[str] = None
+
+class ClientImportResult(BaseModel):
+    rows: int
+    created: int
+    duplicates: int
+    invalid: int
+    errors: List[ClientImportRowError]
+
 class ClientUpdate(BaseModel):
     isArchived: Optional[bool] = None
 
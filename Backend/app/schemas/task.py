@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, Dict
+from typing import Optional, Dict, List
 
 class TaskBase(BaseModel):
     team: str
@@ -23,6 +23,19 @@ class TaskUpdate(BaseModel):
     submissionLink: Optional[str] = None
     # allow updating other fields if needed
 
+class TaskBulkUpdate(TaskUpdate):
+    id: str
+
+class TaskBulkItemResult(BaseModel):
+    id: str
+    status: str  # updated, not_found, conflict, invalid, error
+    detail: Optional[str] = None
+
+class TaskBulkResult(BaseModel):
+    matched: int
+    modified: int
+    results: List[TaskBulkItemResult]
+
 class TaskOut(TaskBase):
     id: str
     assignedTo: Optional[str] = None
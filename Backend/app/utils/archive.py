@@ -0,0 +1,150 @@
+from datetime import date, timedelta
+from bson import ObjectId
+from pymongo import ReplaceOne, DeleteMany
+from pymongo.errors import BulkWriteError
+from app.utils.team_stats import (
+    COMPLETED_STATUSES, STAT_FIELDS, TEAM_STATS_ARCHIVE, aggregate_team_stats, team_stats_group
+)
+from app.utils.versions import bump_versions
+
+CLIENTS_ARCHIVE = "clients_archive"
+TASKS_ARCHIVE = "tasks_archive"
+# Live collection -> where its aged-out history goes
+ARCHIVES = {"clients": CLIENTS_ARCHIVE, "tasks": TASKS_ARCHIVE}
+
+
+def archive_cutoff(days):
+    # deliveryDate is stored as YYYY-MM-DD, so the cutoff compares as a string
+    return (date.today() - timedelta(days=days)).isoformat()
+
+
+def archivable_clients(cutoff):
+    # Also no tasks left in the live collection, see _without_live_tasks
+    return {"isArchived": True, "deliveryDate": {"$lt": cutoff}}
+
+
+def archivable_tasks(cutoff):
+    return {"status": {"$in": list(COMPLETED_STATUSES)}, "deliveryDate": {"$lt": cutoff}}
+
+
+async def _without_live_tasks(db, docs):
+    # delete_task takes a task's amount off the live client's totalAmount, so a client
+    # stays live until its last task has been archived
+    client_ids = [doc["clientID"] for doc in docs if doc.get("clientID")]
+    busy = set(await db["tasks"].distinct("clientID", {"clientID": {"$in": client_ids}}))
+    return [doc for doc in docs if doc.get("clientID") not in busy]
+
+
+async def _copy_batch(target, docs, batch_id):
+    # Copies carry the batch they were moved in; "done" flips once the live side
+    # is deleted (and, for tasks, the batch's totals are folded), so a run that
+    # died half way is finished by the next one. A copy left by such a run comes
+    # back as a duplicate _id and is settled with its own batch.
+    marked = [{**doc, "archive": {"batch": batch_id, "done": False}} for doc in docs]
+    try:
+        await target.insert_many(marked, ordered=False)
+    except BulkWriteError as e:
+        if any(err.get("code") != 11000 for err in e.details.get("writeErrors", [])):
+            raise
+
+
+async def _fold_task_batch(db, batch_id):
+    # The batch's share of team_stats, recomputed from its copies in tasks_archive
+    # and written under its own key, so folding the same batch twice changes nothing
+    totals = await aggregate_team_stats(db, TASKS_ARCHIVE, {"archive.batch": batch_id})
+    ops = [
+        ReplaceOne({"_id": {"batch": batch_id, "team": team}}, {"team": team, **stats}, upsert=True)
+        for team, stats in totals.items()
+    ]
+    if ops:
+        await db[TEAM_STATS_ARCHIVE].bulk_write(ops, ordered=False)
+
+
+async def _settle_batch(db, collection, query, batch_id, ids):
+    # Delete the live originals that still match `query`. One that changed since it
+    # was copied (a task re-opened, a client un-archived) stays live and its copy is
+    # dropped instead, so nothing is lost or counted twice.
+    source, target = db[collection], db[ARCHIVES[collection]]
+    result = await source.delete_many({"_id": {"$in": ids}, **query})
+    if result.deleted_count < len(ids):
+        kept = [doc["_id"] async for doc in source.find({"_id": {"$in": ids}}, {"_id": 1})]
+        if kept:
+            await target.delete_many({"_id": {"$in": kept}, "archive.batch": batch_id})
+    if collection == "tasks":
+        await _fold_task_batch(db, batch_id)
+    await target.update_many({"archive.batch": batch_id}, {"$set": {"archive.done": True}})
+    return result.deleted_count
+
+
+async def _resume_batches(db, collection, query):
+    # Finish batches an earlier run copied but never settled
+    target = db[ARCHIVES[collection]]
+    moved = 0
+    for batch_id in await target.distinct("archive.batch", {"archive.done": False}):
+        ids = await target.distinct("_id", {"archive.batch": batch_id})
+        moved += await _settle_batch(db, collection, query, batch_id, ids)
+    return moved
+
+
+async def archive_collection(db, collection, query, batch_size, dry_run=False):
+    # Copy, delete, fold, mark done: batch by batch in _id order, each step safe to repeat
+    source = db[collection]
+    if dry_run and collection == "tasks":
+        return await source.count_documents(query), set()
+    moved = 0 if dry_run else await _resume_batches(db, collection, query)
+    teams = set()
+    last_id = None
+    while True:
+        batch_query = query if last_id is None else {**query, "_id": {"$gt": last_id}}
+        docs = await source.find(batch_query).sort("_id", 1).limit(batch_size).to_list(length=batch_size)
+        if not docs:
+            break
+        last_id = docs[-1]["_id"]
+        if collection == "clients":
+            docs = await _without_live_tasks(db, docs)
+        if dry_run:
+            # Clients are counted against the tasks as they are now; a real run moves
+            # the tasks first and may free a few more
+            moved += len(docs)
+            continue
+        if not docs:
+            continue
+        batch_id = ObjectId()
+        await _copy_batch(db[ARCHIVES[collection]], docs, batch_id)
+        moved += await _settle_batch(db, collection, query, batch_id, [doc["_id"] for doc in docs])
+        teams.update(doc.get("team") for doc in docs)
+    return moved, teams
+
+
+async def archive_old_data(db, days, batch_size, dry_run=False):
+    cutoff = archive_cutoff(days)
+    # Tasks first, so clients whose last tasks just moved can follow in the same run
+    tasks, teams = await archive_collection(db, "tasks", archivable_tasks(cutoff), batch_size, dry_run=dry_run)
+    clients, _ = await archive_collection(db, "clients", archivable_clients(cutoff), batch_size, dry_run=dry_run)
+    if not dry_run:
+        # List ETags cover the archive too, so cached pages are revalidated
+        changed = ([("clients", ())] if clients else []) + ([("tasks", teams)] if tasks else [])
+        await bump_versions(db, *changed)
+    return {"cutoff": cutoff, "clients": clients, "tasks": tasks}
+
+
+async def rebuild_archived_team_stats(db):
+    # Full scan over tasks_archive, for when team_stats_archive itself is suspect.
+    # Written per batch, like the archive run does, so a later resumed batch
+    # replaces its own totals instead of adding to them.
+    rows = await db[TASKS_ARCHIVE].aggregate(
+        [team_stats_group({"batch": "$archive.batch", "team": "$team"})]
+    ).to_list(length=None)
+    ops = [DeleteMany({})]
+    archived = {}
+    for row in rows:
+        team = row["_id"].get("team")
+        if not team:
+            continue
+        stats = {k: row[k] for k in STAT_FIELDS}
+        ops.append(ReplaceOne({"_id": {"batch": row["_id"].get("batch"), "team": team}}, {"team": team, **stats}, upsert=True))
+        totals = archived.setdefault(team, dict.fromkeys(STAT_FIELDS, 0))
+        for k in STAT_FIELDS:
+            totals[k] += stats[k]
+    await db[TEAM_STATS_ARCHIVE].bulk_write(ops)
+    return archived
@@ -0,0 +1,105 @@
+from pydantic import ValidationError
+from pymongo.errors import BulkWriteError
+from app.schemas.client import ClientCreate
+from app.utils.helpers import DELIVERABLE_KEYS, format_client_id, generate_activity_code, is_selected, new_client_document
+from app.utils.sequences import CLIENT_ID_COUNTER, reserve_sequence_block
+from app.utils.tabular import unflatten_client
+from app.utils.versions import bump_version
+
+IMPORT_BATCH_SIZE = 500
+
+
+def _validation_detail(error):
+    return "; ".join(f"{'.'.join(str(p) for p in e['loc'])}: {e['msg']}" for e in error.errors())
+
+
+def _parse_row(row):
+    # Any problem with a single row becomes a ValueError, reported against that row
+    if isinstance(row, Exception):
+        raise ValueError(str(row))
+    try:
+        return ClientCreate(**unflatten_client(row))
+    except ValidationError as e:
+        raise ValueError(_validation_detail(e))
+    except (TypeError, OverflowError) as e:
+        raise ValueError(str(e))
+
+
+async def _import_batch(db, batch, seen, report, on_inserted):
+    # batch: [(row_number, ClientCreate)]. One $in query for duplicates against the
+    # active clients, one counter $inc for the IDs and one insert_many.
+    names = list({c.clientName for _, c in batch})
+    phones = list({c.phone for _, c in batch})
+    existing = {}
+    cursor = db["clients"].find(
+        {"isArchived": False, "clientName": {"$in": names}, "phone": {"$in": phones}},
+        {"clientName": 1, "phone": 1, "clientID": 1}
+    )
+    async for doc in cursor:
+        existing[(doc["clientName"], doc["phone"])] = doc.get("clientID")
+
+    fresh = []
+    for row_number, client in batch:
+        key = (client.clientName, client.phone)
+        if key in existing:
+            report["errors"].append({"row": row_number, "status": "duplicate", "detail": f"Client exists as {existing[key]}"})
+        elif key in seen:
+            report["errors"].append({"row": row_number, "status": "duplicate", "detail": f"Same client as row {seen[key]}"})
+        else:
+            seen[key] = row_number
+            fresh.append((row_number, client))
+    report["duplicates"] += len(batch) - len(fresh)
+    if not fresh:
+        return
+
+    first_num = await reserve_sequence_block(db, CLIENT_ID_COUNTER, len(fresh))
+    docs = []
+    for offset, (_, client) in enumerate(fresh):
+        client_id = format_client_id(first_num + offset)
+        # A new client ID starts every activity sequence at 1
+        codes = {
+            key: generate_activity_code(client_id, key, 1)
+            for key in DELIVERABLE_KEYS if is_selected(getattr(client, key))
+        }
+        docs.append(new_client_document(client, client_id, codes))
+
+    failed = {}
+    try:
+        await db["clients"].insert_many(docs, ordered=False)
+    except BulkWriteError as e:
+        # e.g. a concurrent POST /clients created the same active client
+        failed = {err["index"]: err.get("errmsg", "Write failed") for err in e.details.get("writeErrors", [])}
+    inserted = []
+    for index, (row_number, _) in enumerate(fresh):
+        if index in failed:
+            report["errors"].append({"row": row_number, "status": "error", "detail": failed[index]})
+        else:
+            inserted.append(docs[index])
+    report["created"] += len(inserted)
+    if on_inserted and inserted:
+        await on_inserted(inserted)
+
+
+async def import_clients(db, rows, batch_size=IMPORT_BATCH_SIZE, on_inserted=None):
+    # rows: async iterator of (row_number, dict or parse error) from app.utils.tabular.
+    # Only failures are kept per row, so the report stays small for big clean imports.
+    report = {"rows": 0, "created": 0, "duplicates": 0, "invalid": 0, "errors": []}
+    seen = {}
+    batch = []
+    async for row_number, row in rows:
+        report["rows"] += 1
+        try:
+            batch.append((row_number, _parse_row(row)))
+        except ValueError as e:
+            report["invalid"] += 1
+            report["errors"].append({"row": row_number, "status": "invalid", "detail": str(e)})
+            continue
+        if len(batch) >= batch_size:
+            await _import_batch(db, batch, seen, report, on_inserted)
+            batch = []
+    if batch:
+        await _import_batch(db, batch, seen, report, on_inserted)
+    if report["created"]:
+        await bump_version(db, "clients")
+    report["errors"].sort(key=lambda e: e["row"])
+    return report
@@ -0,0 +1,37 @@
+from typing import Optional
+from fastapi import HTTPException, Response
+
+# MessagePack is optional: without the msgpack package every endpoint keeps answering JSON
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+MSGPACK_MEDIA_TYPES = (MSGPACK_MEDIA_TYPE, "application/x-msgpack")
+
+
+def wants_msgpack(accept: Optional[str]):
+    if msgpack is None or not accept:
+        return False
+    for part in accept.split(","):
+        media_type, _, params = part.strip().partition(";")
+        if media_type.strip() in MSGPACK_MEDIA_TYPES and "q=0" not in params.replace(" ", "").split(";"):
+            return True
+    return False
+
+
+def require_msgpack():
+    if msgpack is None:
+        raise HTTPException(status_code=400, detail="MessagePack support is not installed on the server")
+
+
+def packb(obj):
+    return msgpack.packb(obj, use_bin_type=True)
+
+
+class MsgPackResponse(Response):
+    media_type = MSGPACK_MEDIA_TYPE
+
+    def render(self, content):
+        return packb(content)
@@ -1,21 +1,22 @@
 import re
-from datetime import datetime
+from datetime import date, datetime
+from fastapi import HTTPException
+from app.utils.sequences import CLIENT_ID_COUNTER, next_sequence
+from app.utils.search_keys import CLIENT_SEARCH_KEYS, client_search_keys, task_search_keys
+
+DELIVERABLE_KEYS = ["Web", "SEO", "Campaign", "Calls", "Posters", "Reels", "Shorts", "Longform", "Carousel", "EventDay", "Blog"]
+
+def format_client_id(num):
+    return f"C{num:03d}"
 
 async def generate_client_id(db):
-    # Get all clients, find max numeric part of clientID
-    cursor = db["clients"].find({}, {"clientID": 1}).sort("clientID", -1).limit(1)
-    last_client = await cursor.to_list(length=1)
-    if not last_client:
-        return "C001"
-    last_id = last_client[0]["clientID"]
-    match = re.search(r"C(\d+)", last_id)
-    if match:
-        num = int(match.group(1)) + 1
-        return f"C{num:03d}"
-    return "C001"
-
-def generate_activity_code(clientID, service_type, sequence=1):
-    date = datetime.now()
+    # Atomic counter instead of sorting clients by clientID (which was O(n),
+    # lexicographic past C999 and racy between concurrent creates)
+    num = await next_sequence(db, CLIENT_ID_COUNTER)
+    return format_client_id(num)
+
+def generate_activity_code(clientID, service_type, sequence=1, date=None):
+    date = date or datetime.now()
     year_digit = str(date.year)[-1]
     month = date.month
     # Extract numeric part from clientID
@@ -27,4 +28,138 @@ def generate_activity_code(clientID, service_type, sequence=1):
         "Carousel": "C", "EventDay": "ED", "Blog": "B"
     }
     type_code = type_map.get(service_type, "GEN")
-    return f"{year_digit}{month}{client_num}{type_code}{sequence}"
\ No newline at end of file
+    return f"{year_digit}{month}{client_num}{type_code}{sequence}"
+
+ISO_DATE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+def parse_iso_date(name, value):
+    # Anything but a real YYYY-MM-DD would compare wrongly against deliveryDate
+    try:
+        if ISO_DATE.fullmatch(value) and date.fromisoformat(value):
+            return value
+    except ValueError:
+        pass
+    raise HTTPException(status_code=400, detail=f"{name} must be a date as YYYY-MM-DD")
+
+def delivery_window(date_from=None, date_to=None):
+    # deliveryDate is stored as YYYY-MM-DD, so string comparison orders by date
+    window = {}
+    if date_from:
+        window["$gte"] = parse_iso_date("date_from", date_from)
+    if date_to:
+        window["$lte"] = parse_iso_date("date_to", date_to)
+    return window
+
+def is_selected(item):
+    # The Dashboard only sends checked deliverables; count > 0 marks a real order
+    return bool(item) and item.get("count", 0) > 0
+
+def client_merge_pipeline(client_data, client_id=None, activity_codes=None):
+    # Update pipeline that creates the client or adds the new deliverables onto the
+    # existing one, entirely on the server. With upsert=True new and existing clients
+    # go through the same single atomic write.
+    fields = {}
+    for key in ["industry", "deliveryDate", "email"]:
+        # An existing client keeps its details, as before
+        fields[key] = {"$ifNull": ["$" + key, {"$literal": getattr(client_data, key)}]}
+    if client_id is not None:
+        fields["clientID"] = {"$ifNull": ["$clientID", {"$literal": client_id}]}
+        fields["activityCodes"] = {"$ifNull": ["$activityCodes", {"$literal": activity_codes or {}}]}
+    for key in DELIVERABLE_KEYS:
+        item = getattr(client_data, key)
+        old = "$" + key
+        if not is_selected(item):
+            fields[key] = {"$ifNull": [old, {"$literal": item}]}
+            continue
+        extra = {k: v for k, v in item.items() if k not in ("count", "amount", "amo", "min")}
+        fields[key] = {"$mergeObjects": [
+            {"$ifNull": [old, {}]},
+            {"$literal": extra},
+            {
+                "count": {"$add": [{"$ifNull": [old + ".count", 0]}, item.get("count", 0)]},
+                "amount": {"$add": [
+                    {"$ifNull": [old + ".amount", {"$ifNull": [old + ".amo", 0]}]},
+                    item.get("amount", 0) or item.get("amo", 0)
+                ]},
+                "min": {"$add": [{"$ifNull": [old + ".min", 0]}, item.get("min", 0)]},
+            },
+        ]}
+    total = {"$add": [{"$ifNull": ["$" + key + ".amount", 0]} for key in DELIVERABLE_KEYS]}
+    return [{"$set": fields}, {"$set": {"totalAmount": total, "search": CLIENT_SEARCH_KEYS}}]
+
+def new_client_document(client_data, client_id, activity_codes):
+    # The document client_merge_pipeline upserts for a brand new client, built in
+    # Python for bulk inserts
+    doc = {
+        "clientName": client_data.clientName,
+        "phone": client_data.phone,
+        "isArchived": False,
+        "industry": client_data.industry,
+        "deliveryDate": client_data.deliveryDate,
+        "email": client_data.email,
+        "clientID": client_id,
+        "activityCodes": activity_codes,
+    }
+    for key in DELIVERABLE_KEYS:
+        item = getattr(client_data, key)
+        if not is_selected(item):
+            doc[key] = item
+            continue
+        extra = {k: v for k, v in item.items() if k not in ("count", "amount", "amo", "min")}
+        doc[key] = {**extra, "count": item.get("count", 0), "amount": _item_amount(item), "min": item.get("min", 0)}
+    doc["totalAmount"] = sum((doc[key] or {}).get("amount") or 0 for key in DELIVERABLE_KEYS)
+    doc["search"] = client_search_keys(doc)
+    return doc
+
+
+# Which client deliverables each team works on
+TEAM_SERVICES = {
+    "website": ["Web"],
+    "seo": ["SEO"],
+    "campaign": ["Campaign"],
+    "telecaller": ["Calls"],
+    "branding": ["Posters", "Reels", "Shorts", "Longform", "Carousel", "EventDay", "Blog"],
+}
+
+# Tasks key their count/minutes/amount by the label the team pages show, which
+# differs from the client deliverable key for EventDay
+TASK_SERVICE_LABELS = {"EventDay": "Event Day"}
+
+def _item_amount(item):
+    return item.get("amount") or item.get("amo") or 0
+
+def build_team_task(client, team):
+    # Same task shape the Dashboard used to build per team before POST /tasks
+    services = [s for s in TEAM_SERVICES[team] if (client.get(s) or {}).get("count", 0) > 0]
+    if not services:
+        return None
+    codes = client.get("activityCodes") or {}
+    activity_code = next((codes[s] for s in services if s in codes), None) or next(iter(codes.values()), "PENDING")
+    task = {
+        "team": team,
+        "client": client["clientName"],
+        "clientID": client["clientID"],
+        "activityCode": activity_code,
+        "deliveryDate": client["deliveryDate"],
+        "count": {},
+        "minutes": {},
+        "amount": {},
+        "description": "",
+        "callsDescription": "",
+        "status": "Pending",
+        "remarks": "",
+        "submissionLink": "",
+        "search": task_search_keys({"activityCode": activity_code}),
+    }
+    for s in services:
+        item = client[s]
+        label = TASK_SERVICE_LABELS.get(s, s)
+        task["count"][label] = item.get("count", 0)
+        task["amount"][label] = _item_amount(item)
+        if s != "EventDay":
+            task["minutes"][label] = item.get("min", 0) or 0
+    if team == "telecaller":
+        task["callsDescription"] = client["Calls"].get("description", "")
+    elif team != "branding":
+        task["description"] = client[services[0]].get("description", "")
+    return task
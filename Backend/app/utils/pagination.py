@@ -0,0 +1,169 @@
+import base64
+from typing import Optional, Tuple
+import orjson
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import HTTPException
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from app.utils.encoding import MSGPACK_MEDIA_TYPE, MsgPackResponse, packb, wants_msgpack
+
+# Hard cap on a single page so a client can't ask for the whole collection again
+MAX_PAGE_SIZE = 500
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def parse_cursor(after: Optional[str], sort_field: str = "_id"):
+    # _id-ordered pages use the bare ObjectId; other orders carry (sort value, _id)
+    if after is None:
+        return None
+    try:
+        if sort_field == "_id":
+            return ObjectId(after)
+        value, last_id = orjson.loads(base64.urlsafe_b64decode(after + "=" * (-len(after) % 4)))
+        return value, ObjectId(last_id)
+    except (InvalidId, TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def encode_cursor(doc: dict, sort_field: str = "_id"):
+    if sort_field == "_id":
+        return doc["id"]
+    return base64.urlsafe_b64encode(orjson.dumps([doc.get(sort_field), doc["id"]])).decode().rstrip("=")
+
+
+def model_projection(model, fields: Optional[Tuple[str, ...]] = None):
+    # Ask Mongo for exactly the fields the response model declares (or the subset
+    # picked by select_fields) and let the server turn _id into the string id, so
+    # Python never touches each document. Optional fields and fields with a default
+    # are filled in the same way validation would have done (is_admin=False, ...).
+    projection = {}
+    for name, field in model.model_fields.items():
+        if name == "id" or (fields is not None and name not in fields):
+            continue
+        if field.is_required():
+            projection[name] = 1
+        else:
+            default = field.get_default(call_default_factory=True)
+            projection[name] = {"$ifNull": [f"${name}", {"$literal": default}]}
+    projection["id"] = {"$toString": "$_id"}
+    projection["_id"] = 0
+    return projection
+
+
+def select_fields(model, fields: Optional[str]):
+    # ?fields=clientName,clientID -> the names of those fields of `model` (id is
+    # always kept), or None for all of them; pass the result on as `fields`
+    if not fields:
+        return None
+    requested = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = sorted(requested - set(model.model_fields))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown field(s): {', '.join(unknown)}")
+    return tuple(name for name in model.model_fields if name in requested or name == "id")
+
+
+def build_pipeline(
+    query: dict,
+    projection: dict,
+    limit: Optional[int] = None,
+    after: Optional[str] = None,
+    union: Optional[str] = None,
+    sort: Optional[Tuple[str, int]] = None
+):
+    # Keyset pagination: the next page starts strictly after the last (sort value, _id)
+    # seen, so we never skip over documents the way skip() does. _id breaks ties and
+    # runs in the same direction, so one compound index serves both.
+    field, direction = sort or ("_id", 1)
+    op = "$gt" if direction == 1 else "$lt"
+    position = parse_cursor(after, field)
+    if position is not None:
+        if field == "_id":
+            query = {**query, "_id": {op: position}}
+        else:
+            value, last_id = position
+            query = {"$and": [query, {"$or": [{field: {op: value}}, {field: value, "_id": {op: last_id}}]}]}
+    paginate = limit is not None or position is not None or sort is not None
+    page = [{"$match": query}]
+    if paginate:
+        page.append({"$sort": {field: direction, "_id": direction} if field != "_id" else {"_id": direction}})
+    if limit is not None:
+        page.append({"$limit": min(limit, MAX_PAGE_SIZE)})
+    pipeline = list(page)
+    if union:
+        # Same page taken from the archive collection (it uses its own indexes),
+        # then the two halves are merged back into one order
+        pipeline.append({"$unionWith": {"coll": union, "pipeline": page}})
+        if paginate:
+            pipeline.extend(page[1:])
+    pipeline.append({"$project": projection})
+    return pipeline
+
+
+async def fetch_page(
+    collection,
+    query: dict,
+    model,
+    limit: Optional[int] = None,
+    after: Optional[str] = None,
+    union: Optional[str] = None,
+    accept: Optional[str] = None,
+    sort: Optional[Tuple[str, int]] = None,
+    fields: Optional[Tuple[str, ...]] = None
+):
+    # Documents come back already shaped like `model`; they are trusted DB output,
+    # so they skip response_model validation and go straight to orjson (or msgpack).
+    sort_field = sort[0] if sort else "_id"
+    projection = model_projection(model, fields)
+    # The next cursor needs the sort value even when ?fields= left it out
+    extra_field = sort_field != "_id" and sort_field not in projection
+    if extra_field:
+        projection[sort_field] = 1
+    pipeline = build_pipeline(query, projection, limit, after, union, sort)
+    docs = await collection.aggregate(pipeline).to_list(length=None)
+    next_cursor = None
+    # A full page means there may be more; hand back the last position as the next cursor
+    if limit is not None and docs and len(docs) == min(limit, MAX_PAGE_SIZE):
+        next_cursor = encode_cursor(docs[-1], sort_field)
+    if extra_field:
+        for doc in docs:
+            doc.pop(sort_field, None)
+    response = MsgPackResponse(docs) if wants_msgpack(accept) else ORJSONResponse(docs)
+    # Same URL, different body depending on Accept
+    response.headers["Vary"] = "Accept"
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return response
+
+
+async def _ndjson_lines(cursor):
+    async for doc in cursor:
+        yield orjson.dumps(doc) + b"\n"
+
+
+async def _msgpack_objects(cursor):
+    # Back-to-back msgpack maps; msgpack.Unpacker reads them one at a time
+    async for doc in cursor:
+        yield packb(doc)
+
+
+def stream_ndjson(
+    collection,
+    query: dict,
+    model,
+    limit: Optional[int] = None,
+    after: Optional[str] = None,
+    union: Optional[str] = None,
+    accept: Optional[str] = None,
+    sort: Optional[Tuple[str, int]] = None,
+    fields: Optional[Tuple[str, ...]] = None
+):
+    # Documents go out as Motor yields them, one JSON object per line
+    # (or one msgpack object after another when the client accepts msgpack)
+    pipeline = build_pipeline(query, model_projection(model, fields), limit, after, union, sort)
+    cursor = collection.aggregate(pipeline)
+    if wants_msgpack(accept):
+        response = StreamingResponse(_msgpack_objects(cursor), media_type=MSGPACK_MEDIA_TYPE)
+    else:
+        response = StreamingResponse(_ndjson_lines(cursor), media_type="application/x-ndjson")
+    response.headers["Vary"] = "Accept"
+    return response
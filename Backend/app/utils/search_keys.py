@@ -0,0 +1,59 @@
+# Lowercased copies of the fields /search matches on, kept under "search" on every
+# client and task. Anchored regexes only become index range scans when they are
+# case-sensitive, so the query is lowercased and matched against these instead.
+CLIENT_KEYS_FILTER = "search.name"
+TASK_KEYS_FILTER = "search.code"
+
+
+def _lower(value):
+    return str(value or "").lower()
+
+
+def client_search_keys(client):
+    name = _lower(client.get("clientName"))
+    return {
+        "ids": [v for v in (_lower(client.get("clientID")), _lower(client.get("phone")), _lower(client.get("email"))) if v],
+        "name": name,
+        "words": [w for w in name.split(" ") if w],
+        "industry": _lower(client.get("industry")),
+    }
+
+
+def task_search_keys(task):
+    return {"code": _lower(task.get("activityCode"))}
+
+
+def _lower_expr(field):
+    return {"$toLower": {"$ifNull": [f"${field}", ""]}}
+
+
+def _non_empty(items):
+    return {"$filter": {"input": items, "cond": {"$ne": ["$$this", ""]}}}
+
+
+# The same keys as aggregation expressions, for update pipelines
+CLIENT_SEARCH_KEYS = {
+    "ids": _non_empty([_lower_expr("clientID"), _lower_expr("phone"), _lower_expr("email")]),
+    "name": _lower_expr("clientName"),
+    "words": _non_empty({"$split": [_lower_expr("clientName"), " "]}),
+    "industry": _lower_expr("industry"),
+}
+TASK_SEARCH_KEYS = {"code": _lower_expr("activityCode")}
+
+# collection -> (field that is null until the keys exist, expression)
+SEARCH_KEYS = {
+    "clients": (CLIENT_KEYS_FILTER, CLIENT_SEARCH_KEYS),
+    "clients_archive": (CLIENT_KEYS_FILTER, CLIENT_SEARCH_KEYS),
+    "tasks": (TASK_KEYS_FILTER, TASK_SEARCH_KEYS),
+    "tasks_archive": (TASK_KEYS_FILTER, TASK_SEARCH_KEYS),
+}
+
+
+async def ensure_search_keys(db):
+    # Backfill documents written before the keys existed (or by scripts that skip
+    # them); the null match is answered from the search indexes, so it is cheap
+    # once everything has its keys
+    for collection, (field, keys) in SEARCH_KEYS.items():
+        result = await db[collection].update_many({field: None}, [{"$set": {"search": keys}}])
+        if result.modified_count:
+            print(f"Added search keys to {result.modified_count} {collection} documents.")
@@ -0,0 +1,43 @@
+import re
+from pymongo import ReturnDocument
+
+COUNTERS = "counters"
+CLIENT_ID_COUNTER = "clientID"
+
+
+async def next_sequence(db, name, step=1):
+    # Single atomic round trip; upsert creates the counter on first use
+    counter = await db[COUNTERS].find_one_and_update(
+        {"_id": name},
+        {"$inc": {"seq": step}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    return counter["seq"]
+
+
+async def reserve_sequence_block(db, name, size):
+    # Claims `size` consecutive values with one $inc; returns the first of them
+    end = await next_sequence(db, name, step=size)
+    return end - size + 1
+
+
+async def seed_counters(db):
+    # One-time migration: move the clientID counter up to what existing data already
+    # uses. Activity codes need no counter: a client's codes are all assigned when it
+    # is created, each at sequence 1. $max makes it safe to run again or while the
+    # app is live.
+    highest = 0
+    cursor = db["clients"].find({}, {"clientID": 1})
+    async for client in cursor:
+        match = re.search(r"C(\d+)", client.get("clientID") or "")
+        if match:
+            highest = max(highest, int(match.group(1)))
+    await db[COUNTERS].update_one({"_id": CLIENT_ID_COUNTER}, {"$max": {"seq": highest}}, upsert=True)
+    return highest
+
+
+async def ensure_counters(db):
+    # Run the migration automatically the first time the app starts against old data
+    if await db[COUNTERS].find_one({"_id": CLIENT_ID_COUNTER}) is None:
+        await seed_counters(db)
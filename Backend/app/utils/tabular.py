@@ -0,0 +1,169 @@
+import codecs
+import csv
+import io
+import orjson
+from app.utils.encoding import packb
+from app.utils.helpers import DELIVERABLE_KEYS, TASK_SERVICE_LABELS
+
+# Flat column layouts shared by the exports: every deliverable dict becomes a fixed
+# set of "<Service>.<field>" columns, so the header is known before the first row
+CLIENT_FIELDS = ["id", "clientID", "clientName", "industry", "deliveryDate", "phone", "email", "isArchived", "totalAmount"]
+CLIENT_DELIVERABLE_FIELDS = ["count", "amount", "min", "description"]
+CLIENT_COLUMNS = CLIENT_FIELDS + [f"{k}.{f}" for k in DELIVERABLE_KEYS for f in CLIENT_DELIVERABLE_FIELDS]
+
+TASK_FIELDS = [
+    "id", "team", "clientID", "client", "activityCode", "deliveryDate", "assignedTo", "status",
+    "remarks", "submissionLink", "description", "callsDescription", "totalAmount"
+]
+TASK_SERVICE_FIELDS = ["count", "minutes", "amount"]
+TASK_COLUMNS = TASK_FIELDS + [f"{k}.{f}" for k in DELIVERABLE_KEYS for f in TASK_SERVICE_FIELDS]
+# "Event Day.count" (the task label) and "EventDay.count" name the same column
+DELIVERABLE_LABELS = {label: key for key, label in TASK_SERVICE_LABELS.items()}
+
+
+def flatten_client(doc):
+    row = {f: doc.get(f) for f in CLIENT_FIELDS}
+    for key in DELIVERABLE_KEYS:
+        item = doc.get(key) or {}
+        for field in CLIENT_DELIVERABLE_FIELDS:
+            # Older clients stored the amount as "amo"
+            value = item.get(field) if field != "amount" else item.get("amount", item.get("amo"))
+            row[f"{key}.{field}"] = value
+    return row
+
+
+def flatten_task(doc):
+    row = {f: doc.get(f) for f in TASK_FIELDS}
+    row["totalAmount"] = sum(v for v in (doc.get("amount") or {}).values() if v)
+    for field in TASK_SERVICE_FIELDS:
+        values = doc.get(field) or {}
+        for key in DELIVERABLE_KEYS:
+            row[f"{key}.{field}"] = values.get(TASK_SERVICE_LABELS.get(key, key))
+    return row
+
+
+async def csv_chunks(cursor, columns, flatten, rows_per_chunk):
+    # One reusable buffer, flushed every rows_per_chunk rows, so memory stays at
+    # one chunk however many documents the cursor yields
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    rows = 0
+    async for doc in cursor:
+        row = flatten(doc)
+        writer.writerow([row.get(c) for c in columns])
+        rows += 1
+        if rows % rows_per_chunk == 0:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+async def ndjson_chunks(cursor, flatten, rows_per_chunk):
+    lines = []
+    async for doc in cursor:
+        lines.append(orjson.dumps(flatten(doc)))
+        if len(lines) >= rows_per_chunk:
+            yield b"\n".join(lines) + b"\n"
+            lines.clear()
+    if lines:
+        yield b"\n".join(lines) + b"\n"
+
+
+async def msgpack_chunks(cursor, flatten, rows_per_chunk):
+    # Rows as back-to-back msgpack maps, flushed every rows_per_chunk rows
+    parts = []
+    async for doc in cursor:
+        parts.append(packb(flatten(doc)))
+        if len(parts) >= rows_per_chunk:
+            yield b"".join(parts)
+            parts.clear()
+    if parts:
+        yield b"".join(parts)
+
+
+async def _text_lines(chunks):
+    # Complete lines from a byte stream, decoded incrementally so multi-byte
+    # characters split across chunks survive
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+async def read_csv_rows(chunks):
+    # Yields (row_number, dict); a quoted field may span lines, so a record is
+    # only parsed once its quotes balance
+    header = None
+    record = ""
+    row_number = 0
+    async for line in _text_lines(chunks):
+        record = f"{record}\n{line}" if record else line
+        if record.count('"') % 2:
+            continue
+        text, record = record.rstrip("\r"), ""
+        if not text.strip():
+            continue
+        values = next(csv.reader([text]))
+        if header is None:
+            header = values
+            continue
+        row_number += 1
+        yield row_number, dict(zip(header, values))
+    if record:
+        row_number += 1
+        yield row_number, ValueError("Unterminated quoted field")
+
+
+async def read_ndjson_rows(chunks):
+    # Yields (row_number, dict), or (row_number, error) for a line that isn't a JSON object
+    row_number = 0
+    async for line in _text_lines(chunks):
+        if not line.strip():
+            continue
+        row_number += 1
+        try:
+            row = orjson.loads(line)
+        except orjson.JSONDecodeError as e:
+            yield row_number, e
+            continue
+        yield row_number, row if isinstance(row, dict) else ValueError("Expected a JSON object")
+
+
+def _deliverable_field(field, value):
+    # count/amount/min are whole numbers however they arrive ("3", "3.0", 3.0);
+    # int() raises ValueError/TypeError/OverflowError for anything else
+    if field in ("count", "amount", "min"):
+        return int(float(value)) if isinstance(value, str) else int(value)
+    return value
+
+
+def unflatten_client(row):
+    # Accepts the export layout ("Web.count" columns, empty cells) as well as nested
+    # ClientCreate-shaped objects; export-only columns (id, clientID, ...) are dropped
+    out = {}
+    for column, value in row.items():
+        if value is None or value == "":
+            continue
+        if "." not in column:
+            if column in CLIENT_FIELDS and column not in ("id", "clientID", "isArchived", "totalAmount"):
+                out[column] = str(value) if column == "phone" else value
+            elif DELIVERABLE_LABELS.get(column, column) in DELIVERABLE_KEYS and isinstance(value, dict):
+                out[DELIVERABLE_LABELS.get(column, column)] = {
+                    f: _deliverable_field(f, v) for f, v in value.items() if v is not None and v != ""
+                }
+            continue
+        key, field = column.split(".", 1)
+        key = DELIVERABLE_LABELS.get(key, key)
+        if key not in DELIVERABLE_KEYS:
+            continue
+        out.setdefault(key, {})[field] = _deliverable_field(field, value)
+    return out
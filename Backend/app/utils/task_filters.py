@@ -0,0 +1,121 @@
+from datetime import date
+from bson import ObjectId
+from fastapi import HTTPException
+from app.schemas.task import TaskOut
+from app.utils.archive import TASKS_ARCHIVE
+from app.utils.helpers import delivery_window
+from app.utils.pagination import build_pipeline, encode_cursor, model_projection
+from app.utils.team_stats import COMPLETED_STATUSES
+
+# ?sort= values GET /tasks accepts, each backed by the (..., deliveryDate, _id)
+# indexes in app.indexes; anything else would need an in-memory sort
+TASK_SORTS = {
+    "_id": ("_id", 1),
+    "deliveryDate": ("deliveryDate", 1),
+    "-deliveryDate": ("deliveryDate", -1),
+}
+
+
+def parse_task_sort(sort):
+    if sort is None:
+        return None
+    if sort not in TASK_SORTS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of: {', '.join(TASK_SORTS)}")
+    # The default order needs no explicit sort stage
+    return None if sort == "_id" else TASK_SORTS[sort]
+
+
+def build_task_query(team=None, assignedTo=None, status=None, clientID=None, date_from=None, date_to=None, overdue=False):
+    query = {}
+    if team:
+        query["team"] = team
+    if assignedTo:
+        query["assignedTo"] = assignedTo
+    if clientID:
+        query["clientID"] = clientID
+    if status:
+        query["status"] = {"$in": list(status)}
+    window = delivery_window(date_from, date_to)
+    if overdue:
+        # Past its deliveryDate (YYYY-MM-DD strings compare as dates) and not finished
+        window["$lt"] = date.today().isoformat()
+        query.setdefault("status", {})["$nin"] = list(COMPLETED_STATUSES)
+    if window:
+        query["deliveryDate"] = window
+    return query
+
+
+# Every filter-and-sort combination the task views use. `manage.py explain-tasks`
+# (and tests/test_task_filters.py) runs each through explain() and fails on a
+# COLLSCAN or a blocking SORT; add new shapes here together with their index.
+TASK_QUERY_SHAPES = [
+    {"filters": {}, "sort": None},
+    {"filters": {}, "sort": "deliveryDate"},
+    {"filters": {"overdue": True}, "sort": "deliveryDate"},
+    {"filters": {"date_from": "2026-01-01", "date_to": "2026-12-31"}, "sort": "deliveryDate"},
+    {"filters": {"status": ["Pending"]}, "sort": None},
+    {"filters": {"status": ["Pending", "In Progress"]}, "sort": "-deliveryDate"},
+    {"filters": {"team": "branding"}, "sort": None},
+    {"filters": {"team": "branding"}, "sort": "deliveryDate"},
+    {"filters": {"team": "branding", "status": ["Pending"]}, "sort": None},
+    {"filters": {"team": "branding", "status": ["Pending", "Assigned"]}, "sort": "deliveryDate"},
+    {"filters": {"team": "branding", "overdue": True}, "sort": "deliveryDate"},
+    {"filters": {"team": "branding", "date_from": "2026-01-01", "date_to": "2026-03-31"}, "sort": "-deliveryDate"},
+    {"filters": {"assignedTo": "E001"}, "sort": None},
+    {"filters": {"assignedTo": "E001", "status": ["Pending"]}, "sort": None},
+    {"filters": {"assignedTo": "E001"}, "sort": "deliveryDate"},
+    {"filters": {"assignedTo": "E001", "overdue": True}, "sort": "deliveryDate"},
+    {"filters": {"clientID": "C001"}, "sort": None},
+    {"filters": {"clientID": "C001"}, "sort": "deliveryDate"},
+]
+
+# Where each shape is explained: the live page, the include_archived page (the
+# $unionWith pipeline as GET /tasks sends it) and the archive half on its own, so
+# its plan shows whether or not the server reports the sub-pipeline
+EXPLAIN_SOURCES = [
+    ("tasks", "tasks", None),
+    ("tasks+archive", "tasks", TASKS_ARCHIVE),
+    ("archive", TASKS_ARCHIVE, None),
+]
+
+
+def winning_plan_stages(explain):
+    # (stage, indexName) pairs from the chosen plans; rejected alternatives are skipped
+    if isinstance(explain, dict):
+        if "stage" in explain:
+            yield explain["stage"], explain.get("indexName")
+        for key, value in explain.items():
+            if key != "rejectedPlans":
+                yield from winning_plan_stages(value)
+    elif isinstance(explain, list):
+        for item in explain:
+            yield from winning_plan_stages(item)
+
+
+async def explain_task_shapes(database):
+    # One result per shape, source and page (first, and a follow-up from a cursor):
+    # {"shape", "source", "page", "collscan", "sort", "indexes"}. "sort" is an
+    # in-memory SORT in the query plan; the $sort that merges the two halves of a
+    # union page only ever sees two pages and isn't counted.
+    results = []
+    for shape in TASK_QUERY_SHAPES:
+        sort = parse_task_sort(shape["sort"])
+        field = sort[0] if sort else "_id"
+        cursor = encode_cursor({"id": str(ObjectId()), field: "2026-06-01"}, field)
+        for source, collection, union in EXPLAIN_SOURCES:
+            for after in (None, cursor):
+                query = build_task_query(**shape["filters"])
+                pipeline = build_pipeline(query, model_projection(TaskOut), limit=100, after=after, union=union, sort=sort)
+                explain = await database.command(
+                    "explain", {"aggregate": collection, "pipeline": pipeline, "cursor": {}}, verbosity="queryPlanner"
+                )
+                stages = list(winning_plan_stages(explain))
+                results.append({
+                    "shape": shape,
+                    "source": source,
+                    "page": "next" if after else "first",
+                    "collscan": any(stage == "COLLSCAN" for stage, _ in stages),
+                    "sort": any(stage == "SORT" for stage, _ in stages),
+                    "indexes": sorted({name for _, name in stages if name}),
+                })
+    return results
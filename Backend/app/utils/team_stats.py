@@ -0,0 +1,150 @@
+from pymongo import DeleteMany, ReplaceOne
+
+TEAM_STATS = "team_stats"
+# Frozen totals of the tasks moved to tasks_archive, one document per archive batch
+# and team; folded into team_stats on rebuild
+TEAM_STATS_ARCHIVE = "team_stats_archive"
+COMPLETED_STATUSES = ("Completed", "Call Completed")
+STAT_FIELDS = ("totalTasks", "completedTasks", "totalMinutes", "completedMinutes")
+
+
+def is_completed(status):
+    return status in COMPLETED_STATUSES
+
+
+def task_minutes(task):
+    return sum(v for v in (task.get("minutes") or {}).values() if v)
+
+
+def task_contribution(task, sign=1):
+    # What a single task adds to its team's rollup
+    minutes = task_minutes(task)
+    completed = is_completed(task.get("status"))
+    return {
+        "totalTasks": sign,
+        "completedTasks": sign if completed else 0,
+        "totalMinutes": sign * minutes,
+        "completedMinutes": sign * minutes if completed else 0,
+    }
+
+
+async def apply_delta(db, team, delta):
+    delta = {k: v for k, v in delta.items() if v}
+    if not team or not delta:
+        return
+    await db[TEAM_STATS].update_one({"_id": team}, {"$inc": delta}, upsert=True)
+
+
+async def record_task_created(db, task):
+    await apply_delta(db, task.get("team"), task_contribution(task))
+
+
+async def record_tasks_created(db, tasks):
+    # One $inc per team for a batch of new tasks
+    per_team = {}
+    for task in tasks:
+        totals = per_team.setdefault(task.get("team"), dict.fromkeys(STAT_FIELDS, 0))
+        for k, v in task_contribution(task).items():
+            totals[k] += v
+    for team, delta in per_team.items():
+        await apply_delta(db, team, delta)
+
+
+async def record_task_deleted(db, task):
+    await apply_delta(db, task.get("team"), task_contribution(task, sign=-1))
+
+
+async def record_task_updated(db, before, after):
+    # Only the completed counters move when a status crosses the completed boundary
+    was, now = is_completed(before.get("status")), is_completed(after.get("status"))
+    if was == now:
+        return
+    sign = 1 if now else -1
+    await apply_delta(db, after.get("team"), {
+        "completedTasks": sign,
+        "completedMinutes": sign * task_minutes(after),
+    })
+
+
+async def record_tasks_updated(db, changes):
+    # changes: (before, after) pairs from a bulk update; one $inc per team
+    per_team = {}
+    for before, after in changes:
+        was, now = is_completed(before.get("status")), is_completed(after.get("status"))
+        if was == now:
+            continue
+        sign = 1 if now else -1
+        totals = per_team.setdefault(after.get("team"), {"completedTasks": 0, "completedMinutes": 0})
+        totals["completedTasks"] += sign
+        totals["completedMinutes"] += sign * task_minutes(after)
+    for team, delta in per_team.items():
+        await apply_delta(db, team, delta)
+
+
+def dict_values_sum(field):
+    # Aggregation expression summing the values of a per-service dict like minutes/amount
+    return {"$sum": {"$map": {"input": {"$objectToArray": {"$ifNull": ["$" + field, {}]}}, "as": "item", "in": "$$item.v"}}}
+
+
+def _minutes_sum():
+    return dict_values_sum("minutes")
+
+
+def team_stats_group(key="$team"):
+    # $group stage computing the rollup fields per `key`
+    completed = {"$in": ["$status", list(COMPLETED_STATUSES)]}
+    return {
+        "$group": {
+            "_id": key,
+            "totalTasks": {"$sum": 1},
+            "completedTasks": {"$sum": {"$cond": [completed, 1, 0]}},
+            "totalMinutes": {"$sum": _minutes_sum()},
+            "completedMinutes": {"$sum": {"$cond": [completed, _minutes_sum(), 0]}},
+        }
+    }
+
+
+async def aggregate_team_stats(db, collection="tasks", match=None):
+    # Full scan over tasks (or just `match`); only used to rebuild/verify the rollup
+    pipeline = ([{"$match": match}] if match else []) + [team_stats_group()]
+    results = await db[collection].aggregate(pipeline).to_list(length=None)
+    return {row["_id"]: {k: row[k] for k in STAT_FIELDS} for row in results if row["_id"]}
+
+
+async def read_team_stats(db):
+    rows = await db[TEAM_STATS].find({}).to_list(length=None)
+    return {row["_id"]: {k: row.get(k, 0) for k in STAT_FIELDS} for row in rows}
+
+
+async def read_archived_team_stats(db):
+    # Summed per team; documents written before the per-batch layout are keyed by team
+    group = {"_id": {"$ifNull": ["$team", "$_id"]}, **{k: {"$sum": f"${k}"} for k in STAT_FIELDS}}
+    rows = await db[TEAM_STATS_ARCHIVE].aggregate([{"$group": group}]).to_list(length=None)
+    return {row["_id"]: {k: row[k] for k in STAT_FIELDS} for row in rows}
+
+
+async def rebuild_team_stats(db):
+    # Recompute from scratch and report which teams had drifted. Archived tasks
+    # still count towards efficiency, through their precomputed totals.
+    live = await aggregate_team_stats(db)
+    for team, archived in (await read_archived_team_stats(db)).items():
+        totals = live.setdefault(team, dict.fromkeys(STAT_FIELDS, 0))
+        for k in STAT_FIELDS:
+            totals[k] += archived[k]
+    current = await read_team_stats(db)
+    drift = {}
+    for team in set(live) | set(current):
+        expected = live.get(team, dict.fromkeys(STAT_FIELDS, 0))
+        actual = current.get(team, dict.fromkeys(STAT_FIELDS, 0))
+        if expected != actual:
+            drift[team] = {"expected": expected, "actual": actual}
+    ops = [ReplaceOne({"_id": team}, stats, upsert=True) for team, stats in live.items()]
+    ops.append(DeleteMany({"_id": {"$nin": list(live)}}))
+    await db[TEAM_STATS].bulk_write(ops)
+    return drift
+
+
+async def ensure_team_stats(db):
+    # First start after the rollup was introduced: build it from the existing tasks
+    if await db[TEAM_STATS].estimated_document_count() == 0:
+        await rebuild_team_stats(db)
@@ -0,0 +1,61 @@
+from typing import Optional
+from fastapi import Response
+from pymongo import UpdateOne
+from app.utils.sequences import COUNTERS
+
+
+def version_key(collection, partition=None):
+    if partition is None:
+        return f"version:{collection}"
+    return f"version:{collection}:{partition}"
+
+
+async def bump_version(db, collection, partitions=()):
+    # Every write route calls this after it commits; the collection-wide version
+    # and the version of each touched partition (team for tasks) move together
+    await bump_versions(db, (collection, partitions))
+
+
+async def bump_versions(db, *changes):
+    # changes: (collection, partitions) pairs, for routes that write to more than
+    # one collection; every version moves in the same unordered bulk_write
+    ops = []
+    for collection, partitions in changes:
+        keys = [version_key(collection)] + [version_key(collection, p) for p in set(partitions) if p]
+        ops += [UpdateOne({"_id": key}, {"$inc": {"seq": 1}}, upsert=True) for key in keys]
+    if ops:
+        await db[COUNTERS].bulk_write(ops, ordered=False)
+
+
+async def current_etag(db, collection, partition=None):
+    key = version_key(collection, partition)
+    counter = await db[COUNTERS].find_one({"_id": key})
+    seq = counter["seq"] if counter else 0
+    return f'W/"{key}-{seq}"'
+
+
+def variant_etag(etag: str, variant: str):
+    # Same version, different body (msgpack instead of JSON, "overdue" as of a date)
+    return f'{etag[:-1]}-{variant}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str):
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison: ignore the W/ prefix on either side
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return etag.removeprefix("W/") in candidates
+
+
+def not_modified(etag: str):
+    # Vary as the full response would, so caches keep JSON and msgpack apart
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept"})
+
+
+def with_etag(response: Response, etag: str):
+    response.headers["ETag"] = etag
+    # Let browsers keep the body but revalidate it every time
+    response.headers["Cache-Control"] = "no-cache"
+    return response
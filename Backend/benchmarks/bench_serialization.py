@@ -0,0 +1,101 @@
+"""Compare the old list-endpoint serialization path with the fast path.
+
+Old path: set doc["id"] in a Python loop, validate against List[TaskOut] and
+encode with the stdlib json module (what FastAPI does for a response_model).
+Fast path: documents arrive already projected by Mongo (id computed from _id)
+and are encoded directly with orjson.
+
+The Mongo side of the projection isn't measured here; run from Backend/:
+
+    python -m benchmarks.bench_serialization --sizes 10000 100000
+"""
+import argparse
+import json
+import time
+from typing import List
+import orjson
+from bson import ObjectId
+from pydantic import TypeAdapter
+from app.schemas.task import TaskOut
+
+TEAMS = ["branding", "website", "seo", "campaign", "telecaller"]
+
+
+def make_db_docs(n):
+    return [
+        {
+            "_id": ObjectId(),
+            "team": TEAMS[i % len(TEAMS)],
+            "clientID": f"C{i % 5000:03d}",
+            "client": f"Client {i % 5000}",
+            "activityCode": f"65{i % 5000}P1",
+            "deliveryDate": "2026-10-18",
+            "assignedTo": f"E{i % 50:03d}",
+            "status": "Pending",
+            "remarks": "",
+            "submissionLink": "",
+            "count": {"Posters": 3, "Reels": 2},
+            "minutes": {"Posters": 90, "Reels": 120},
+            "amount": {"Posters": 1500, "Reels": 4000},
+            "description": "",
+            "callsDescription": "",
+        }
+        for i in range(n)
+    ]
+
+
+def project_like_mongo(docs):
+    # What the $project stage hands back: id as a string, no _id
+    out = []
+    for d in docs:
+        d = dict(d)
+        d["id"] = str(d.pop("_id"))
+        out.append(d)
+    return out
+
+
+def old_path(docs, adapter):
+    for d in docs:
+        d["id"] = str(d["_id"])
+    validated = adapter.validate_python(docs)
+    content = adapter.dump_python(validated, mode="json")
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def fast_path(docs):
+    return orjson.dumps(docs)
+
+
+def best_of(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    adapter = TypeAdapter(List[TaskOut])
+    results = []
+    for n in args.sizes:
+        docs = make_db_docs(n)
+        projected = project_like_mongo(docs)
+        old = best_of(lambda: old_path([dict(d) for d in docs], adapter), args.repeat)
+        fast = best_of(lambda: fast_path(projected), args.repeat)
+        results.append({
+            "documents": n,
+            "old_ms": round(old * 1000, 2),
+            "fast_ms": round(fast * 1000, 2),
+            "speedup": round(old / fast, 1) if fast else None,
+        })
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
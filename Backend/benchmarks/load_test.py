@@ -0,0 +1,223 @@
+"""Load/benchmark harness for the API hot paths.
+
+Runs the FastAPI app in-process (httpx ASGI transport, so no network or uvicorn
+noise) against a local mongod, or against mongomock-motor with --in-memory.
+Seeds a fresh database with the requested number of tasks, then drives each
+scenario concurrently and prints p50/p95/p99 latency and requests/second as
+JSON so runs can be compared across commits. Run from Backend/:
+
+    python -m benchmarks.load_test --tasks 1000 100000 --concurrency 32
+    python -m benchmarks.load_test --in-memory --tasks 1000
+
+The target database is dropped before every dataset size. mongomock doesn't
+implement every operator the routes use ($mergeObjects in create_client), so
+use a real mongod for numbers worth comparing.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import time
+
+import httpx
+
+TEAMS = ["branding", "website", "seo", "campaign", "telecaller"]
+BENCH_PASSWORD = "bench-password"
+SEED_BATCH = 5000
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def make_task(i):
+    team = TEAMS[i % len(TEAMS)]
+    return {
+        "team": team,
+        "assignedTo": f"B{i % 50:03d}",
+        "clientID": f"C{i % 10000:03d}",
+        "client": f"Client {i % 10000}",
+        "activityCode": f"6{i % 9 + 1}{i % 10000}P1",
+        "deliveryDate": f"2026-{i % 12 + 1:02d}-{i % 28 + 1:02d}",
+        "status": "Completed" if i % 3 == 0 else "Pending",
+        "remarks": "",
+        "submissionLink": "",
+        "count": {"Posters": 2},
+        "minutes": {"Posters": 60},
+        "amount": {"Posters": 1000},
+        "description": "",
+        "callsDescription": "",
+    }
+
+
+async def seed(database, tasks, hashed_password):
+    await database["users"].insert_one({
+        "empID": "BENCH", "name": "Bench Admin", "role": "Manager", "team": "admin",
+        "email": "bench@example.com", "hashed_password": hashed_password, "is_admin": True,
+    })
+    for start in range(0, tasks, SEED_BATCH):
+        batch = [make_task(i) for i in range(start, min(tasks, start + SEED_BATCH))]
+        await database["tasks"].insert_many(batch, ordered=False)
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+async def run_scenario(client, name, make_request, requests, concurrency):
+    latencies = []
+    errors = 0
+    counter = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            start = time.perf_counter()
+            response = await make_request(client, i)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    ms = lambda v: round(v * 1000, 3) if v is not None else None
+    return {
+        "scenario": name,
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else None,
+        "p50_ms": ms(percentile(latencies, 50)),
+        "p95_ms": ms(percentile(latencies, 95)),
+        "p99_ms": ms(percentile(latencies, 99)),
+        "mean_ms": ms(statistics.fmean(latencies)) if latencies else None,
+    }
+
+
+def scenarios(headers, task_ids, page_size):
+    async def login(client, i):
+        return await client.post("/api/auth/login", json={"email": "bench@example.com", "password": BENCH_PASSWORD})
+
+    async def list_team_tasks(client, i):
+        params = {"team": TEAMS[i % len(TEAMS)]}
+        if page_size:
+            params["limit"] = page_size
+        return await client.get("/api/tasks/", params=params, headers=headers)
+
+    async def update_task(client, i):
+        task_id = task_ids[i % len(task_ids)]
+        status = "Completed" if i % 2 else "Assigned"
+        return await client.put(f"/api/tasks/{task_id}", json={"status": status, "assignedTo": "B001"}, headers=headers)
+
+    async def create_client(client, i):
+        body = {
+            "clientName": f"Bench Client {i % 500}", "industry": "Retail", "deliveryDate": "2026-12-01",
+            "phone": f"9{i % 500:09d}", "email": f"client{i % 500}@example.com",
+            "Web": {"count": 1, "amount": 5000, "min": 120, "description": "Landing page"},
+            "Posters": {"count": 3, "amount": 1500, "min": 90},
+        }
+        return await client.post("/api/clients/", json=body, headers=headers)
+
+    async def team_efficiency(client, i):
+        return await client.get("/api/efficiency/teams", headers=headers)
+
+    return {
+        "login": login,
+        "get_tasks_by_team": list_team_tasks,
+        "put_task": update_task,
+        "post_client": create_client,
+        "efficiency_teams": team_efficiency,
+    }
+
+
+async def bench_dataset(args, tasks):
+    from app.database import db, client_options
+    from app.indexes import ensure_indexes
+    from app.utils.sequences import ensure_counters
+    from app.utils.team_stats import ensure_team_stats
+    from app.core.security import create_access_token, get_password_hash
+    from app.main import app
+
+    if args.in_memory:
+        from mongomock_motor import AsyncMongoMockClient
+        db.client = AsyncMongoMockClient()
+    else:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        db.client = AsyncIOMotorClient(args.mongo_uri, **client_options())
+    await db.client.drop_database(args.db_name)
+    db.db = db.client[args.db_name]
+
+    seed_start = time.perf_counter()
+    await seed(db.db, tasks, get_password_hash(BENCH_PASSWORD))
+    seed_seconds = time.perf_counter() - seed_start
+    # Same preparation the app does on startup
+    await ensure_indexes(db.db)
+    await ensure_counters(db.db)
+    await ensure_team_stats(db.db)
+
+    sample = await db.db["tasks"].aggregate([{"$sample": {"size": 1000}}, {"$project": {"_id": 1}}]).to_list(length=None)
+    task_ids = [str(t["_id"]) for t in sample]
+    random.Random(0).shuffle(task_ids)
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': 'BENCH'})}"}
+
+    results = []
+    # Server errors are counted per scenario instead of aborting the run
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        for name, make_request in scenarios(headers, task_ids, args.page_size).items():
+            if args.only and name not in args.only:
+                continue
+            requests = args.login_requests if name == "login" else args.requests
+            results.append(await run_scenario(client, name, make_request, requests, args.concurrency))
+
+    if not args.keep:
+        await db.client.drop_database(args.db_name)
+    db.client.close()
+    return {"tasks": tasks, "seed_seconds": round(seed_seconds, 2), "results": results}
+
+
+async def main(args):
+    report = {
+        "commit": git_commit(),
+        "backend": "mongomock" if args.in_memory else args.mongo_uri,
+        "concurrency": args.concurrency,
+        "page_size": args.page_size,
+        "datasets": [],
+    }
+    for tasks in args.tasks:
+        report["datasets"].append(await bench_dataset(args, tasks))
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mongo-uri", default=os.environ.get("BENCH_MONGO_URI", "mongodb://localhost:27017"))
+    parser.add_argument("--db-name", default="reach_skyline_bench")
+    parser.add_argument("--in-memory", action="store_true", help="Use mongomock-motor instead of a real mongod")
+    parser.add_argument("--tasks", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per scenario")
+    parser.add_argument("--login-requests", type=int, default=200, help="Requests for the bcrypt-bound login scenario")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--page-size", type=int, default=100, help="limit for GET /tasks; 0 fetches the full team list")
+    parser.add_argument("--only", nargs="+", help="Run only these scenarios")
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    parser.add_argument("--keep", action="store_true", help="Don't drop the benchmark database afterwards")
+    return parser
+
+
+if __name__ == "__main__":
+    asyncio.run(main(build_parser().parse_args()))
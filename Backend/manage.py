@@ -0,0 +1,128 @@
+import argparse
+import asyncio
+import json
+from motor.motor_asyncio import AsyncIOMotorClient
+from app.config import settings
+from app.indexes import ensure_indexes, check_indexes
+from app.utils.sequences import seed_counters
+from app.utils.team_stats import rebuild_team_stats
+from app.utils.archive import archive_old_data, rebuild_archived_team_stats
+from app.utils.client_import import IMPORT_BATCH_SIZE, import_clients
+from app.utils.tabular import read_csv_rows, read_ndjson_rows
+from app.utils.task_filters import explain_task_shapes
+
+
+async def cmd_indexes(database, args):
+    if args.check:
+        report = await check_indexes(database)
+        print(json.dumps(report, indent=2))
+        if any(r["missing"] for r in report.values()):
+            return 1
+        return 0
+    failed = await ensure_indexes(database)
+    if failed:
+        print(f"{len(failed)} index(es) could not be created.")
+        return 1
+    print("Indexes are up to date.")
+    return 0
+
+
+async def cmd_migrate_counters(database, args):
+    highest = await seed_counters(database)
+    print(f"clientID counter is at least {highest}.")
+    return 0
+
+
+async def cmd_rebuild_team_stats(database, args):
+    if args.include_archive:
+        await rebuild_archived_team_stats(database)
+        print("team_stats_archive rebuilt from tasks_archive.")
+    drift = await rebuild_team_stats(database)
+    if drift:
+        print("Rollup had drifted from the live aggregate:")
+        print(json.dumps(drift, indent=2))
+    else:
+        print("Rollup matched the live aggregate.")
+    print("team_stats rebuilt.")
+    return 1 if drift else 0
+
+
+async def cmd_archive(database, args):
+    report = await archive_old_data(database, args.days, args.batch_size, dry_run=args.dry_run)
+    verb = "Would move" if args.dry_run else "Moved"
+    print(f"{verb} {report['clients']} clients and {report['tasks']} tasks with deliveryDate before {report['cutoff']}.")
+    return 0
+
+
+async def _file_chunks(path, size=1 << 16):
+    with open(path, "rb") as f:
+        while chunk := f.read(size):
+            yield chunk
+
+
+async def cmd_import_clients(database, args):
+    fmt = args.format or ("ndjson" if args.file.endswith((".ndjson", ".jsonl")) else "csv")
+    reader = read_csv_rows if fmt == "csv" else read_ndjson_rows
+    report = await import_clients(database, reader(_file_chunks(args.file)), args.batch_size)
+    print(json.dumps(report, indent=2))
+    print(f"{report['created']} of {report['rows']} rows imported.")
+    return 1 if report["errors"] else 0
+
+
+async def cmd_explain_tasks(database, args):
+    # Every supported GET /tasks shape, live and with include_archived, first page
+    # and a follow-up page, must be read from an index in index order
+    results = await explain_task_shapes(database)
+    for result in results:
+        label = json.dumps({**result["shape"], "source": result["source"], "page": result["page"]})
+        verdict = "COLLSCAN" if result["collscan"] else "SORT" if result["sort"] else "ok"
+        print(f"{verdict:8} {label} {', '.join(result['indexes'])}")
+    if await database["tasks"].estimated_document_count() == 0:
+        print("tasks is empty; plans are only meaningful against real data.")
+    return 1 if any(result["collscan"] or result["sort"] for result in results) else 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Reach Skyline CRM maintenance commands")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("indexes", help="Create the declared MongoDB indexes")
+    p.add_argument("--check", action="store_true", help="Only report missing, unused and undeclared indexes")
+    p.set_defaults(func=cmd_indexes)
+
+    p = sub.add_parser("migrate-counters", help="Seed the clientID counter from existing clients")
+    p.set_defaults(func=cmd_migrate_counters)
+
+    p = sub.add_parser("rebuild-team-stats", help="Recompute the team_stats rollup and report drift")
+    p.add_argument("--include-archive", action="store_true", help="Also recompute the archived totals from tasks_archive")
+    p.set_defaults(func=cmd_rebuild_team_stats)
+
+    p = sub.add_parser("archive", help="Move old archived clients and finished tasks to the archive collections")
+    p.add_argument("--days", type=int, default=settings.ARCHIVE_AFTER_DAYS, help="Age by deliveryDate")
+    p.add_argument("--batch-size", type=int, default=settings.ARCHIVE_BATCH_SIZE)
+    p.add_argument("--dry-run", action="store_true", help="Only count what would move")
+    p.set_defaults(func=cmd_archive)
+
+    p = sub.add_parser("import-clients", help="Bulk import clients from a CSV or NDJSON file")
+    p.add_argument("file")
+    p.add_argument("--format", choices=["csv", "ndjson"], help="Defaults to the file extension")
+    p.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+    p.set_defaults(func=cmd_import_clients)
+
+    p = sub.add_parser("explain-tasks", help="Fail if any supported GET /tasks filter/sort shape does a COLLSCAN")
+    p.set_defaults(func=cmd_explain_tasks)
+
+    return parser
+
+
+async def main(args):
+    client = AsyncIOMotorClient(settings.MONGO_URI)
+    try:
+        return await args.func(client[settings.DB_NAME], args)
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    args = build_parser().parse_args()
+    raise SystemExit(asyncio.run(main(args)))
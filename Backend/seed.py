@@ -1,7 +1,18 @@
+import argparse
 import asyncio
+import random
+import struct
+import time
+from datetime import date, datetime, timedelta, timezone
+from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import BulkWriteError
 from app.core.security import get_password_hash
 from app.config import settings
+from app.utils.helpers import DELIVERABLE_KEYS, TEAM_SERVICES, build_team_task, format_client_id, generate_activity_code
+from app.utils.search_keys import client_search_keys
+from app.utils.sequences import CLIENT_ID_COUNTER, COUNTERS
+from app.utils.team_stats import rebuild_team_stats
 
 INITIAL_USERS = [
     {
@@ -10,7 +21,7 @@ INITIAL_USERS = [
         "role": "Graphic Designer",
         "team": "branding",
         "email": "rahul@example.com",
-        "hashed_password": get_password_hash("admin123")
+        "password": "admin123"
     },
     {
         "empID": "E002",
@@ -18,7 +29,7 @@ INITIAL_USERS = [
         "role": "SEO Specialist",
         "team": "seo",
         "email": "priya@example.com",
-        "hashed_password": get_password_hash("admin123")
+        "password": "admin123"
     },
     {
         "empID": "E003",
@@ -26,20 +37,37 @@ INITIAL_USERS = [
         "role": "Manager",
         "team": "admin",
         "email": "admin@reachskyline.com",
-        "hashed_password": get_password_hash("supersecret"),   # <-- comma added here
+        "password": "supersecret",
         "is_admin": True
     }
 ]
 
+# Synthetic data for --scale
+TEAM_ROLES = {
+    "branding": "Graphic Designer",
+    "website": "Web Developer",
+    "seo": "SEO Specialist",
+    "campaign": "Campaign Manager",
+    "telecaller": "Telecaller",
+}
+INDUSTRIES = ["Retail", "Healthcare", "Education", "Real Estate", "Hospitality", "Manufacturing", "Finance"]
+TASK_STATUSES = ["Pending", "Assigned", "In Progress", "Completed", "Call Completed"]
+
 async def seed_db():
     print("Connecting to MongoDB...")
     client = AsyncIOMotorClient(settings.MONGO_URI)
     db = client[settings.DB_NAME]
 
+    # Hashing happens here rather than at import time, once per distinct password
+    hashes = {}
     for user in INITIAL_USERS:
         existing = await db.users.find_one({"empID": user["empID"]})
         if not existing:
-            await db.users.insert_one(user)
+            doc = {k: v for k, v in user.items() if k != "password"}
+            if user["password"] not in hashes:
+                hashes[user["password"]] = get_password_hash(user["password"])
+            doc["hashed_password"] = hashes[user["password"]]
+            await db.users.insert_one(doc)
             print(f"Added user: {user['name']} ({user['empID']})")
         else:
             print(f"User {user['empID']} already exists. Skipping.")
@@ -47,5 +75,154 @@ async def seed_db():
     print("Seeding completed.")
     client.close()
 
+# Synthetic clients live in their own clientID range (C100000 and up), so the same
+# seed gives the same IDs whatever the counter already holds; the counter is only
+# moved past the range afterwards
+SYNTHETIC_CLIENT_START = 100_000
+# Fixed _id prefixes per collection, so re-running with the same seed skips what is
+# already there instead of adding a second copy of every task
+SYNTHETIC_KINDS = {"users": 1, "clients": 2, "tasks": 3}
+
+def synthetic_id(base_date, kind, n):
+    # 4-byte timestamp of the base date, then the collection and a 7-byte sequence
+    timestamp = int(datetime(base_date.year, base_date.month, base_date.day, tzinfo=timezone.utc).timestamp())
+    return ObjectId(struct.pack(">IB", timestamp, SYNTHETIC_KINDS[kind]) + n.to_bytes(7, "big"))
+
+def synthetic_users(rng, count, hashed_password, base_date):
+    teams = list(TEAM_ROLES)
+    for n in range(1, count + 1):
+        team = teams[n % len(teams)]
+        yield {
+            "_id": synthetic_id(base_date, "users", n),
+            "empID": f"S{n:05d}",
+            "name": f"Synthetic User {n}",
+            "role": TEAM_ROLES[team],
+            "team": team,
+            "email": f"synthetic{n}@example.com",
+            "hashed_password": hashed_password,
+            "is_admin": False,
+        }
+
+def synthetic_deliverable(rng, key):
+    count = rng.randint(1, 3) if key in ("Web", "SEO", "Campaign") else rng.randint(1, 10)
+    item = {"count": count, "amount": count * rng.choice([500, 1000, 1500, 2500]), "min": count * rng.choice([30, 60, 90, 120])}
+    if key in ("Web", "SEO", "Campaign", "Calls"):
+        item["description"] = f"{key} work"
+    if key == "EventDay":
+        del item["min"]
+    return item
+
+def synthetic_clients(rng, count, first_num, base_date):
+    for offset in range(count):
+        client_id = format_client_id(first_num + offset)
+        selected = rng.sample(DELIVERABLE_KEYS, rng.randint(1, 5))
+        client = {
+            "_id": synthetic_id(base_date, "clients", offset + 1),
+            "clientName": f"Synthetic Client {first_num + offset}",
+            "industry": rng.choice(INDUSTRIES),
+            # Within a year of the base date, never of today
+            "deliveryDate": (base_date + timedelta(days=rng.randint(0, 364))).isoformat(),
+            "phone": f"9{first_num + offset:09d}",
+            "email": f"client{first_num + offset}@example.com",
+            "clientID": client_id,
+            # Clients that already went to the teams are archived, like in production
+            "isArchived": rng.random() < 0.8,
+        }
+        for key in DELIVERABLE_KEYS:
+            client[key] = synthetic_deliverable(rng, key) if key in selected else None
+        client["totalAmount"] = sum(client[k]["amount"] for k in selected)
+        client["activityCodes"] = {k: generate_activity_code(client_id, k, 1, base_date) for k in selected}
+        client["search"] = client_search_keys(client)
+        yield client
+
+def synthetic_tasks(rng, clients, count, users_by_team, base_date):
+    # Team tasks built from archived clients the same way dispatch builds them
+    produced = 0
+    while produced < count:
+        for client in clients:
+            for team in TEAM_SERVICES:
+                task = build_team_task(client, team)
+                if not task:
+                    continue
+                task["_id"] = synthetic_id(base_date, "tasks", produced + 1)
+                task["status"] = rng.choice(TASK_STATUSES)
+                if task["status"] != "Pending" and users_by_team.get(team):
+                    task["assignedTo"] = rng.choice(users_by_team[team])
+                yield task
+                produced += 1
+                if produced >= count:
+                    return
+
+async def insert_batched(collection, docs, batch_size):
+    # Unordered batches: the server can apply each batch in parallel and one
+    # duplicate doesn't stop the rest
+    inserted = duplicates = 0
+    batch = []
+    start = time.perf_counter()
+
+    async def flush():
+        nonlocal inserted, duplicates
+        try:
+            result = await collection.insert_many(batch, ordered=False)
+            inserted += len(result.inserted_ids)
+        except BulkWriteError as e:
+            inserted += e.details.get("nInserted", 0)
+            duplicates += len(e.details.get("writeErrors", []))
+        batch.clear()
+
+    for doc in docs:
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            await flush()
+    if batch:
+        await flush()
+    elapsed = time.perf_counter() - start
+    rate = inserted / elapsed if elapsed else 0
+    print(f"{collection.name}: {inserted} inserted, {duplicates} skipped in {elapsed:.1f}s ({rate:,.0f} docs/s)")
+    return inserted
+
+async def seed_scale(users, clients, tasks, seed, batch_size, password, base_date):
+    print("Connecting to MongoDB...")
+    client = AsyncIOMotorClient(settings.MONGO_URI)
+    db = client[settings.DB_NAME]
+    rng = random.Random(seed)
+    hashed_password = get_password_hash(password)
+
+    user_docs = list(synthetic_users(rng, users, hashed_password, base_date))
+    await insert_batched(db.users, user_docs, batch_size)
+    users_by_team = {}
+    for user in user_docs:
+        users_by_team.setdefault(user["team"], []).append(user["empID"])
+
+    client_docs = list(synthetic_clients(rng, clients, SYNTHETIC_CLIENT_START, base_date))
+    await insert_batched(db.clients, client_docs, batch_size)
+    if clients:
+        # New clients created through the API continue after the synthetic range
+        last_num = SYNTHETIC_CLIENT_START + clients - 1
+        await db[COUNTERS].update_one({"_id": CLIENT_ID_COUNTER}, {"$max": {"seq": last_num}}, upsert=True)
+
+    archived = [c for c in client_docs if c["isArchived"]]
+    if tasks and archived:
+        await insert_batched(db.tasks, synthetic_tasks(rng, archived, tasks, users_by_team, base_date), batch_size)
+        # Bulk inserts bypass the routes, so recompute the efficiency rollup
+        await rebuild_team_stats(db)
+
+    print("Seeding completed.")
+    client.close()
+
 if __name__ == "__main__":
-    asyncio.run(seed_db())
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Seed the Reach Skyline database")
+    parser.add_argument("--scale", action="store_true", help="Generate a large deterministic synthetic dataset")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--clients", type=int, default=10_000)
+    parser.add_argument("--tasks", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=42, help="Random seed, so runs are reproducible")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--password", default="synthetic123", help="Shared password for synthetic users")
+    parser.add_argument("--base-date", type=date.fromisoformat, default=date(2026, 1, 1),
+                        help="Delivery dates and activity codes are derived from this date (YYYY-MM-DD)")
+    args = parser.parse_args()
+    if args.scale:
+        asyncio.run(seed_scale(args.users, args.clients, args.tasks, args.seed, args.batch_size, args.password, args.base_date))
+    else:
+        asyncio.run(seed_db())
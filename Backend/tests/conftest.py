@@ -0,0 +1,111 @@
+"""Shared fixtures: the app on an in-memory Mongo (mongomock-motor), called
+in-process through httpx, with every collection call counted.
+
+Run from Backend/:  python -m pytest tests
+"""
+import os
+import httpx
+import pytest
+from motor.motor_asyncio import AsyncIOMotorClient
+from mongomock_motor import AsyncMongoMockClient
+from pymongo.errors import PyMongoError
+from app.main import app
+from app.database import db
+from app.core.dependencies import user_cache
+from app.core.security import create_access_token
+from app.utils.sequences import ensure_counters
+from app.utils.team_stats import ensure_team_stats
+
+# Collection methods that each send one command to the server (find/aggregate:
+# the initial batch; results here always fit in it)
+COMMAND_METHODS = {
+    "aggregate", "bulk_write", "count_documents", "delete_many", "delete_one",
+    "estimated_document_count", "find", "find_one", "find_one_and_delete",
+    "find_one_and_replace", "find_one_and_update", "insert_many", "insert_one",
+    "replace_one", "update_many", "update_one",
+}
+
+# For the tests that read real query plans; never the app's MONGO_URI, since the
+# mongod fixture drops its database
+MONGO_TEST_URI = os.environ.get("MONGO_TEST_URI", "mongodb://localhost:27017")
+
+
+class CountingCollection:
+    def __init__(self, collection, commands):
+        self._collection = collection
+        self._commands = commands
+
+    def __getattr__(self, name):
+        attr = getattr(self._collection, name)
+        if name not in COMMAND_METHODS:
+            return attr
+
+        def counted(*args, **kwargs):
+            self._commands.append((self._collection.name, name))
+            return attr(*args, **kwargs)
+        return counted
+
+
+class CountingDatabase:
+    """Stands in for db.db and records (collection, method) for every command."""
+
+    def __init__(self, database):
+        self._database = database
+        self.commands = []
+
+    def __getitem__(self, name):
+        return CountingCollection(self._database[name], self.commands)
+
+    def __getattr__(self, name):
+        return getattr(self._database, name)
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def mongo():
+    previous = db.client, db.db
+    db.client = AsyncMongoMockClient()
+    database = CountingDatabase(db.client["test"])
+    db.db = database
+    await ensure_counters(database)
+    await ensure_team_stats(database)
+    user_cache.clear()
+    yield database
+    db.client, db.db = previous
+
+
+@pytest.fixture
+async def admin(mongo):
+    user = {"empID": "E001", "name": "Admin", "role": "Manager", "team": "admin",
+            "email": "admin@example.com", "hashed_password": "x", "is_admin": True}
+    await mongo["users"].insert_one(user)
+    return user
+
+
+@pytest.fixture
+async def client(mongo, admin):
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': admin['empID']})}"}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test", headers=headers) as c:
+        # Warm the user cache, so counts below are the route's own commands
+        await c.get("/api/auth/me")
+        yield c
+
+
+@pytest.fixture
+async def mongod():
+    # A scratch database on a real server; the test is skipped when there is none
+    client = AsyncIOMotorClient(MONGO_TEST_URI, serverSelectionTimeoutMS=1000)
+    try:
+        await client.admin.command("ping")
+    except PyMongoError:
+        client.close()
+        pytest.skip(f"no mongod at {MONGO_TEST_URI} (set MONGO_TEST_URI)")
+    database = client["reach_skyline_explain_test"]
+    await client.drop_database(database.name)
+    yield database
+    await client.drop_database(database.name)
+    client.close()
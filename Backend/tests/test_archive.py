@@ -0,0 +1,32 @@
+import pytest
+from app.utils.archive import CLIENTS_ARCHIVE, TASKS_ARCHIVE, archive_old_data
+
+pytestmark = pytest.mark.anyio
+
+OLD = "2025-01-10"
+
+
+async def test_clients_with_live_tasks_stay_live(client, mongo):
+    await mongo["clients"].insert_many([
+        {"clientID": "C001", "clientName": "Acme", "isArchived": True, "deliveryDate": OLD, "totalAmount": 900},
+        {"clientID": "C002", "clientName": "Bolt", "isArchived": True, "deliveryDate": OLD, "totalAmount": 500},
+    ])
+    task = {"team": "seo", "client": "Acme", "activityCode": "51001S1", "deliveryDate": OLD, "amount": {"SEO": 400}}
+    r = await client.post("/api/tasks/", json={**task, "clientID": "C001"})
+    open_task = r.json()["id"]
+    r = await client.post("/api/tasks/", json={**task, "clientID": "C002"})
+    await client.put(f"/api/tasks/{r.json()['id']}", json={"status": "Completed"})
+
+    assert (await archive_old_data(mongo, 30, 10, dry_run=True))["clients"] == 0
+    report = await archive_old_data(mongo, 30, 10)
+    # Bolt's only task was finished, so both move in one run; Acme still has work
+    assert (report["tasks"], report["clients"]) == (1, 1)
+    assert await mongo[CLIENTS_ARCHIVE].distinct("clientID") == ["C002"]
+    assert await mongo[TASKS_ARCHIVE].distinct("clientID") == ["C002"]
+
+    r = await client.delete(f"/api/tasks/{open_task}")
+    assert r.status_code == 200
+    assert (await mongo["clients"].find_one({"clientID": "C001"}))["totalAmount"] == 500
+    report = await archive_old_data(mongo, 30, 10)
+    assert report["clients"] == 1
+    assert sorted(await mongo[CLIENTS_ARCHIVE].distinct("clientID")) == ["C001", "C002"]
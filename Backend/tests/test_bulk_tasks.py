@@ -0,0 +1,35 @@
+import pytest
+from bson import ObjectId
+from pymongo.errors import AutoReconnect
+from tests.conftest import CountingCollection
+from tests.test_command_counts import create_task
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_bulk_update_reports_races_and_keeps_landed_writes(client, mongo, monkeypatch):
+    ids = [await create_task(client) for _ in range(3)]
+    missing = str(ObjectId())
+
+    async def racing_bulk_write(self, ops, **kwargs):
+        if self._collection.name != "tasks":
+            return await self._collection.bulk_write(ops, **kwargs)
+        # Another writer moves the first task between the pre-read and the write,
+        # then the connection drops after the server applied the rest
+        await self._collection.update_one({"_id": ObjectId(ids[0])}, {"$set": {"status": "In Progress"}})
+        await self._collection.bulk_write(ops, **kwargs)
+        raise AutoReconnect("connection closed")
+
+    monkeypatch.setattr(CountingCollection, "bulk_write", racing_bulk_write, raising=False)
+    r = await client.patch("/api/tasks/bulk", json=[{"id": i, "status": "Completed"} for i in ids + [missing]])
+    monkeypatch.undo()
+
+    assert r.status_code == 200
+    body = r.json()
+    assert [item["status"] for item in body["results"]] == ["conflict", "updated", "updated", "not_found"]
+    assert body["matched"] == 2 and body["modified"] == 2
+    stats = await mongo["team_stats"].find_one({"_id": "seo"})
+    assert stats["completedTasks"] == 2
+    version = await mongo["counters"].find_one({"_id": "version:tasks:seo"})
+    # Three creates and the bulk update
+    assert version["seq"] == 4
@@ -0,0 +1,35 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+CLIENT = '"clientName": "Acme", "industry": "Retail", "deliveryDate": "2026-10-20", "email": "a@example.com"'
+
+
+async def test_csv_import_reports_bad_numbers_per_row(client, mongo):
+    body = (
+        "clientName,industry,deliveryDate,phone,email,Web.count,Web.amount\n"
+        "Acme,Retail,2026-10-20,111,a@example.com,inf,100\n"
+        "Bolt,Retail,2026-10-20,222,b@example.com,lots,100\n"
+        "Core,Retail,2026-10-20,333,c@example.com,2,100\n"
+    )
+    r = await client.post("/api/clients/import", content=body, headers={"Content-Type": "text/csv"})
+    assert r.status_code == 200
+    report = r.json()
+    assert (report["created"], report["invalid"]) == (1, 2)
+    assert [(e["row"], e["status"]) for e in report["errors"]] == [(1, "invalid"), (2, "invalid")]
+
+
+async def test_ndjson_import_coerces_nested_deliverables(client, mongo):
+    body = "\n".join([
+        '{' + CLIENT + ', "phone": "111", "Web": {"count": "3", "amount": 900.0}}',
+        '{' + CLIENT + ', "phone": "222", "Web": {"count": ["3"]}}',
+        '{' + CLIENT + ', "phone": "333", "SEO": {"count": 1e400}}',
+    ])
+    r = await client.post("/api/clients/import", content=body, headers={"Content-Type": "application/x-ndjson"})
+    assert r.status_code == 200
+    report = r.json()
+    assert (report["created"], report["invalid"]) == (1, 2)
+    assert [(e["row"], e["status"]) for e in report["errors"]] == [(2, "invalid"), (3, "invalid")]
+    created = await mongo["clients"].find_one({"phone": "111"})
+    assert created["Web"]["count"] == 3 and created["Web"]["amount"] == 900
+    assert set(created["activityCodes"]) == {"Web"}
@@ -0,0 +1,132 @@
+"""Mongo commands per route (the request behind this: every mutation costs one
+or two server calls). Task writes also keep two bookkeeping documents in step,
+neither of which can share the task's own write:
+
+- the team_stats rollup: one $inc when a task is created or deleted, or when its
+  status crosses the completed boundary
+- the ETag versions in `counters`: one bulk_write per route
+
+so the real cost is written down here and a new round trip fails the test.
+"""
+import pytest
+from bson import ObjectId
+
+pytestmark = pytest.mark.anyio
+
+TASK = {
+    "team": "seo", "clientID": "C001", "client": "Acme", "activityCode": "C001S10101",
+    "deliveryDate": "2026-10-20", "minutes": {"SEO": 30}, "amount": {"SEO": 400},
+}
+
+
+async def create_task(client):
+    r = await client.post("/api/tasks/", json=TASK)
+    assert r.status_code == 200
+    return r.json()["id"]
+
+
+def commands_of(mongo, start):
+    return mongo.commands[start:]
+
+
+async def test_create_task(client, mongo):
+    start = len(mongo.commands)
+    await create_task(client)
+    assert commands_of(mongo, start) == [
+        ("tasks", "insert_one"),
+        ("team_stats", "update_one"),
+        ("counters", "bulk_write"),
+    ]
+
+
+async def test_update_task_without_status_change(client, mongo):
+    task_id = await create_task(client)
+    start = len(mongo.commands)
+    r = await client.put(f"/api/tasks/{task_id}", json={"remarks": "call back"})
+    assert r.status_code == 200
+    # Read-after-write folded into find_one_and_update; no rollup change
+    assert commands_of(mongo, start) == [("tasks", "find_one_and_update"), ("counters", "bulk_write")]
+
+
+async def test_update_task_completing(client, mongo):
+    task_id = await create_task(client)
+    start = len(mongo.commands)
+    r = await client.put(f"/api/tasks/{task_id}", json={"status": "Completed"})
+    assert r.status_code == 200 and r.json()["status"] == "Completed"
+    assert commands_of(mongo, start) == [
+        ("tasks", "find_one_and_update"),
+        ("team_stats", "update_one"),
+        ("counters", "bulk_write"),
+    ]
+
+
+async def test_update_missing_task(client, mongo):
+    start = len(mongo.commands)
+    r = await client.put(f"/api/tasks/{ObjectId()}", json={"status": "Completed"})
+    assert r.status_code == 404
+    assert commands_of(mongo, start) == [("tasks", "find_one_and_update")]
+
+
+async def test_delete_task(client, mongo):
+    await mongo["clients"].insert_one({"clientID": "C001", "clientName": "Acme", "totalAmount": 1000})
+    task_id = await create_task(client)
+    start = len(mongo.commands)
+    r = await client.delete(f"/api/tasks/{task_id}")
+    assert r.status_code == 200
+    # find_one_and_delete replaces find + delete, the client total is
+    # decremented on the server instead of read, modified and written back, and
+    # the tasks and clients versions move in one bulk_write
+    assert commands_of(mongo, start) == [
+        ("tasks", "find_one_and_delete"),
+        ("team_stats", "update_one"),
+        ("clients", "find_one_and_update"),
+        ("counters", "bulk_write"),
+    ]
+    assert (await mongo["clients"].find_one({"clientID": "C001"}))["totalAmount"] == 600
+
+
+async def test_bulk_update_tasks(client, mongo):
+    ids = [await create_task(client) for _ in range(3)]
+    start = len(mongo.commands)
+    r = await client.patch("/api/tasks/bulk", json=[{"id": i, "status": "Completed"} for i in ids])
+    assert r.status_code == 200
+    assert r.json()["matched"] == 3
+    # The $in pre-read and one bulk_write for every item, then one rollup $inc per team
+    assert commands_of(mongo, start) == [
+        ("tasks", "find"),
+        ("tasks", "bulk_write"),
+        ("team_stats", "update_one"),
+        ("counters", "bulk_write"),
+    ]
+    stats = await mongo["team_stats"].find_one({"_id": "seo"})
+    assert stats["completedTasks"] == 3
+
+
+async def test_update_employee(client, mongo, admin):
+    user = await mongo["users"].find_one({"empID": admin["empID"]})
+    start = len(mongo.commands)
+    r = await client.put(f"/api/employees/{user['_id']}", json={"role": "Lead"})
+    assert r.status_code == 200 and r.json()["role"] == "Lead"
+    assert commands_of(mongo, start) == [("users", "find_one_and_update"), ("counters", "bulk_write")]
+
+
+async def test_update_client(client, mongo):
+    result = await mongo["clients"].insert_one({"clientID": "C001", "clientName": "Acme", "totalAmount": 0})
+    start = len(mongo.commands)
+    r = await client.put(f"/api/clients/{result.inserted_id}", json={"industry": "Retail"})
+    assert r.status_code == 200 and r.json()["industry"] == "Retail"
+    assert commands_of(mongo, start) == [("clients", "find_one_and_update"), ("counters", "bulk_write")]
+
+
+async def test_list_tasks(client, mongo):
+    await create_task(client)
+    start = len(mongo.commands)
+    r = await client.get("/api/tasks/", params={"team": "seo", "limit": 10})
+    assert r.status_code == 200 and len(r.json()) == 1
+    # The ETag version read, then the page itself
+    assert commands_of(mongo, start) == [("counters", "find_one"), ("tasks", "aggregate")]
+    etag = r.headers["etag"]
+    start = len(mongo.commands)
+    r = await client.get("/api/tasks/", params={"team": "seo", "limit": 10}, headers={"If-None-Match": etag})
+    assert r.status_code == 304
+    assert commands_of(mongo, start) == [("counters", "find_one")]
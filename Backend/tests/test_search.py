@@ -0,0 +1,35 @@
+import pytest
+from app.api.search import CLIENT_FIELDS, TASK_FIELDS, _client_tiers, _task_tiers, _tier_pipeline
+from app.indexes import ensure_indexes
+from app.schemas.client import ClientCreate
+from app.utils.archive import CLIENTS_ARCHIVE, TASKS_ARCHIVE
+from app.utils.helpers import new_client_document
+from app.utils.task_filters import winning_plan_stages
+
+pytestmark = pytest.mark.anyio
+
+NAMES = ["McDonald Foods", "Mcd", "Big Mac Co", "Alpha", "Mcgregor Mcdermott", "Macro Retail"]
+
+
+async def test_search_tiers_stop_on_the_index(mongod):
+    assert await ensure_indexes(mongod) == []
+    for i, name in enumerate(NAMES):
+        client = ClientCreate(clientName=name, industry="Retail", deliveryDate="2026-01-01", phone=f"98{i}", email=f"c{i}@example.com")
+        collection = CLIENTS_ARCHIVE if i % 2 else "clients"
+        await mongod[collection].insert_one(new_client_document(client, f"C{i + 1:03d}", {}))
+    await mongod["tasks"].insert_one({"activityCode": "61001W1", "search": {"code": "61001w1"}})
+
+    tiers = [("clients", CLIENTS_ARCHIVE, tier, CLIENT_FIELDS) for tier in _client_tiers("mc")]
+    tiers += [("tasks", TASKS_ARCHIVE, tier, TASK_FIELDS) for tier in _task_tiers("61001w")]
+    for collection, archive, (_, key, value), fields in tiers:
+        pipeline = _tier_pipeline(archive, key, value, fields, 3)
+        # Both halves: the live page as sent, and the page the $unionWith runs
+        page = pipeline[:next(i for i, stage in enumerate(pipeline) if "$unionWith" in stage)]
+        for source in (collection, archive):
+            explain = await mongod.command("explain", {"aggregate": source, "pipeline": page, "cursor": {}})
+            stages = [stage for stage, _ in winning_plan_stages(explain)]
+            assert "COLLSCAN" not in stages and "SORT" not in stages, (key, source, stages)
+
+    # The words tier: every name with a word starting "mc", first matching word then _id
+    docs = await mongod["clients"].aggregate(_tier_pipeline(CLIENTS_ARCHIVE, "search.words", _client_tiers("mc")[4][2], CLIENT_FIELDS, 10)).to_list(None)
+    assert [doc["clientName"] for doc in docs] == ["Mcd", "Mcgregor Mcdermott", "McDonald Foods"]
@@ -0,0 +1,41 @@
+import pytest
+from fastapi import HTTPException
+from app.indexes import ensure_indexes
+from app.utils.archive import TASKS_ARCHIVE
+from app.utils.task_filters import build_task_query, explain_task_shapes
+
+pytestmark = pytest.mark.anyio
+
+
+def test_date_window():
+    query = build_task_query(date_from="2026-01-01", date_to="2026-02-28")
+    assert query == {"deliveryDate": {"$gte": "2026-01-01", "$lte": "2026-02-28"}}
+
+
+@pytest.mark.parametrize("value", ["2026-1-01", "01/02/2026", "2026-02-30", "2026-01-01T00:00", "soon"])
+def test_date_window_rejects_non_dates(value):
+    for filters in ({"date_from": value}, {"date_to": value}):
+        with pytest.raises(HTTPException) as error:
+            build_task_query(**filters)
+        assert error.value.status_code == 400
+
+
+async def test_date_window_rejected_by_routes(client):
+    for path in ("/api/tasks/", "/api/export/tasks", "/api/efficiency/employees/E001"):
+        response = await client.get(path, params={"date_from": "2026-13-01"})
+        assert response.status_code == 400, path
+
+
+async def test_task_shapes_use_indexes(mongod):
+    assert await ensure_indexes(mongod) == []
+    # A few documents so the planner has statistics to work with
+    tasks = [
+        {"team": "branding", "assignedTo": "E001", "clientID": "C001", "status": "Pending", "deliveryDate": f"2026-0{m}-15"}
+        for m in range(1, 10)
+    ]
+    await mongod["tasks"].insert_many([dict(task) for task in tasks])
+    await mongod[TASKS_ARCHIVE].insert_many([dict(task, status="Completed") for task in tasks])
+
+    results = await explain_task_shapes(mongod)
+    unindexed = [(r["shape"], r["source"], r["page"]) for r in results if r["collscan"] or r["sort"]]
+    assert unindexed == []
@@ -26,7 +26,7 @@ const EmployeeProfile = () => {
 
   const fetchTasks = async () => {
     try {
-      const response = await api.get(`/tasks?assignedTo=${id}`);
+      const response = await api.get(`/tasks?assignedTo=${id}&include_archived=true`);
       setMyTasks(response.data);
     } catch (error) {
       console.error('Error fetching tasks:', error);